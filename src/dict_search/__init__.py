@@ -1,4 +1,7 @@
-from .dict_search import DictSearch
+from .dict_search import DictSearch, MatchStats
+from .columnar import ColumnarCollection
+from .indexing import IndexedCollection
+from .plan_cache import PLAN_CACHE
 from .operators.bases import (
     Operator,
     LowLevelOperator,
@@ -7,6 +10,7 @@ from .operators.bases import (
     ArraySelector,
     MatchOperator,
     CountOperator,
+    BATCH_CACHE,
 )
 from . import constants
 from .utils import get_from_list, set_from_list, pop_from_list, find_value
@@ -0,0 +1,183 @@
+from typing import Iterable, Iterator, Union
+
+from . import exceptions
+from .operators.bases import MatchNode
+from .operators.operators import high_level_operators as hop, low_level_operators as lop
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed to build a ColumnarCollection
+    np = None
+
+_NUMBER_TYPES = {int, float, bool}
+_MAX_EXACT_FLOAT_INT = 2**53
+_MAX_INT64 = 2**63 - 1
+_MASKS = {
+    lop.Equal: lambda column, comp: column == comp,
+    lop.NotEqual: lambda column, comp: column != comp,
+    lop.Greater: lambda column, comp: column > comp,
+    lop.GreaterEq: lambda column, comp: column >= comp,
+    lop.LessThen: lambda column, comp: column < comp,
+    lop.LessThenEq: lambda column, comp: column <= comp,
+    lop.In: lambda column, comp: np.isin(column, list(comp)),
+}
+_MISSING = object()
+
+
+def _get_path(data, path: tuple):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+
+class _Column:
+    """Numeric values found at one path of the documents, 'present' marks the documents holding the path"""
+
+    def __init__(self, values: "np.ndarray", present: "np.ndarray"):
+        self.values = values
+        self.present = present
+        self.exact_float = values.dtype.kind == "f" or not values.size or abs(values).max() <= _MAX_EXACT_FLOAT_INT
+
+    @classmethod
+    def build(cls, data: list, path: tuple) -> Union["_Column", None]:
+        """None if a value at 'path' is not an int, float or bool, or the ints do not fit the column"""
+        values, present = [], []
+        for d_point in data:
+            value = _get_path(d_point, path)
+            present.append(value is not _MISSING)
+            if value is _MISSING:
+                values.append(0)
+            elif type(value) in _NUMBER_TYPES:
+                values.append(value)
+            else:
+                return None
+        ints = [v for v in values if type(v) is int]
+        if all(type(v) is not float for v in values):
+            if any(abs(v) > _MAX_INT64 for v in ints):
+                return None
+            return cls(np.array(values, dtype=np.int64), np.array(present, dtype=bool))
+        if any(abs(v) > _MAX_EXACT_FLOAT_INT for v in ints):
+            return None
+        return cls(np.array(values, dtype=np.float64), np.array(present, dtype=bool))
+
+    def supports(self, comp) -> bool:
+        if type(comp) not in _NUMBER_TYPES:
+            return False
+        if type(comp) is float:
+            return self.exact_float
+        return abs(comp) <= (_MAX_INT64 if self.values.dtype.kind == "i" else _MAX_EXACT_FLOAT_INT)
+
+
+class ColumnarCollection:
+    """A snapshot of a list of documents with the numeric values of some of their paths stored as NumPy columns
+
+    Filtering it with a DictSearch evaluates the '$eq', '$ne', '$gt', '$gte', '$lt', '$lte' and '$in' tests on
+    those paths, combined through nested dicts, '$and', '$or', '$not' and '$not_any', as boolean mask operations.
+    When the whole match query is vectorized the selected documents are returned without calling the interpreter,
+    otherwise the mask only narrows the documents the whole search runs on.
+    A path is only turned into a column when every document holding it has an int, float or bool there.
+    Requires numpy; rebuild it after modifying the documents.
+    """
+
+    def __init__(self, data: Iterable, paths: list):
+        if np is None:
+            raise exceptions.OptionalDependencyError("numpy", ColumnarCollection.__name__)
+        self.data = list(data)
+        self.paths = [tuple(path) if isinstance(path, (list, tuple)) else (path,) for path in paths]
+        self.columns = {}
+        for path in self.paths:
+            column = _Column.build(self.data, path)
+            if column is not None:
+                self.columns[path] = column
+        self.__presence = {(): np.array([isinstance(d_point, dict) for d_point in self.data], dtype=bool)}
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def mask(self, search) -> tuple:
+        """Boolean mask of the documents that may match 'search' (None if nothing is vectorized), and whether
+        the mask is exactly the set of matching documents"""
+        if not search.match_query:
+            return None, False
+        mask, exact = self.__query_mask(search.match_query_parsed, ())
+        if mask is None:
+            return None, False
+        return mask & self.__presence[()], exact
+
+    def filter(self, search) -> Iterator:
+        """Like DictSearch.filter but evaluating the vectorized tests column wise"""
+        mask, exact = self.mask(search)
+        data = self.data if mask is None else map(self.data.__getitem__, np.flatnonzero(mask).tolist())
+        if exact and not search.select_query:
+            return iter(data)
+        return filter(lambda x: x is not None, map(search, data))
+
+    def __path_presence(self, path: tuple) -> "np.ndarray":
+        if path not in self.__presence:
+            self.__presence[path] = np.array([_get_path(d, path) is not _MISSING for d in self.data], dtype=bool)
+        return self.__presence[path]
+
+    def __query_mask(self, match_dict, path: tuple) -> tuple:
+        if not isinstance(match_dict, dict) or not match_dict:
+            return None, False
+        masks = []
+        for key, node in match_dict.items():
+            if isinstance(node, dict):
+                masks.append(self.__query_mask(node, (*path, key)))
+            elif isinstance(node, MatchNode) and node.kind is None:
+                masks.append(self.__leaf_mask(node.operator, (*path, key)))
+            elif isinstance(node, MatchNode):
+                masks.append(self.__node_mask(node, path))
+            else:
+                masks.append((None, False))
+        return self.__and_masks(masks)
+
+    def __node_mask(self, node: MatchNode, path: tuple) -> tuple:
+        op_type = type(node.operator)
+        if op_type not in (hop.And, hop.Or, hop.Not, hop.NotAny):
+            return self.__leaf_mask(node.operator, path)
+        if not self.__is_exact(node.operator):
+            return None, False
+        masks = [self.__query_mask(query, path) for query in node.query]
+        if op_type is hop.And:
+            return self.__and_masks(masks)
+        if any(mask is None for mask, _ in masks):
+            return None, False
+        exact = all(exact for _, exact in masks)
+        if op_type is hop.Or:
+            return np.logical_or.reduce([mask for mask, _ in masks]), exact
+        if not exact:
+            return None, False
+        combine = np.logical_and if op_type is hop.Not else np.logical_or
+        return ~combine.reduce([mask for mask, _ in masks]) & self.__path_presence(path), True
+
+    @staticmethod
+    def __and_masks(masks: list) -> tuple:
+        """A conjunction narrows with the tests that are vectorized and is exact only if all of them are"""
+        vectorized = [mask for mask, _ in masks if mask is not None]
+        if not vectorized:
+            return None, False
+        return np.logical_and.reduce(vectorized), all(mask is not None and exact for mask, exact in masks)
+
+    def __leaf_mask(self, op, path: tuple) -> tuple:
+        column = self.columns.get(path)
+        op_type = type(op)
+        if column is None or op_type not in _MASKS or not self.__is_exact(op):
+            return None, False
+        comps = list(op.comp) if op_type is lop.In and isinstance(op.comp, (list, tuple, set, frozenset)) else None
+        if op_type is lop.In:
+            if comps is None or not all(column.supports(comp) and comp == comp for comp in comps):
+                return None, False
+        elif not column.supports(op.comp):
+            return None, False
+        return _MASKS[op_type](column.values, comps if comps is not None else op.comp) & column.present, True
+
+    @staticmethod
+    def __is_exact(op) -> bool:
+        """Configured operators may return other values than their implementation"""
+        return not op.expected_exc and not op.allowed_types and not op.ignored_types and not op.default_return
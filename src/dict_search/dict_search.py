@@ -1,12 +1,19 @@
 from pprint import pprint
 from copy import deepcopy
-from collections import abc
-from types import ModuleType
+from collections import Counter, abc
+from functools import lru_cache
+from types import MappingProxyType, ModuleType
 from typing import Type, Union, Callable
 
+from . import columnar
 from . import exceptions
+from . import indexing
+from . import parallel
+from . import plan_cache
+from . import planner
 from . import utils
-from .operators import Operator
+from .operators import BATCH_CACHE, Operator
+from .operators.bases import MatchNode
 from .operators import exceptions as op_exceptions
 from .operators import get_operators
 from .operators.operators import (
@@ -19,6 +26,135 @@ from .operators.operators import (
 )
 
 
+_KIND_LOW_LEVEL = "low_level"
+_KIND_HIGH_LEVEL = "high_level"
+_KIND_ARRAY = "array"
+_KIND_ARRAY_SELECTOR = "array_selector"
+_KIND_COMP = "comp"
+_KIND_FIND = "find"
+_KIND_WHERE = "where"
+
+_SEL_FIELD = "field"
+_SEL_ARRAY = "array"
+_SEL_WHERE = "where"
+_SEL_INDEX = "index"
+_SEL_SLICE = "slice"
+_MISSING = object()
+
+
+def _collapse_path(node: dict) -> tuple:
+    """Keys of the chain of single key plain dicts starting at 'node' and the dict ending it, matched as one path"""
+    keys = []
+    while len(node) == 1:
+        [(key, sub_node)] = node.items()
+        if not isinstance(sub_node, dict):
+            break
+        keys.append(key)
+        node = sub_node
+    return tuple(keys), node
+
+
+_OPS_MODULES = {  # module -> (kind of its operators, attribute of DictSearch listing their names)
+    lop: (_KIND_LOW_LEVEL, "low_level_operators"),
+    hop: (_KIND_HIGH_LEVEL, "high_level_operators"),
+    aop: (_KIND_ARRAY, "array_operators"),
+    asop: (_KIND_ARRAY_SELECTOR, "array_selectors"),
+    cop: (_KIND_ARRAY, "count_operators"),
+    mop: (_KIND_HIGH_LEVEL, "match_operators"),
+}
+_SPECIAL_KINDS = {lop.Compare: _KIND_COMP, lop.Find: _KIND_FIND, asop.Where: _KIND_WHERE}
+
+
+class _OperatorRegistry:
+    """Operators available to a DictSearch, built once per process for every ops_str and custom operators"""
+
+    def __init__(self, ops_str: str, ops_custom: tuple):
+        ops, kinds, modules, names = {}, {}, {}, {attr: [] for _, attr in _OPS_MODULES.values()}
+        for ops_module, (kind, names_attr) in _OPS_MODULES.items():
+            for op_class in get_operators(ops_module):
+                op_name = f"{ops_str}{op_class.name}"
+                if op_name in ops:
+                    raise exceptions.LoadOpsError(ops[op_name], op_name, op_class, ops_module)
+                ops[op_name], kinds[op_name], modules[op_name] = op_class, kind, ops_module
+                names[names_attr].append(op_name)
+        for op_class in ops_custom:
+            op_name = f"{ops_str}{op_class.name}"
+            if op_name in ops:
+                raise exceptions.CustomOpsExistingKey(op_name)
+            ops[op_name], kinds[op_name] = op_class, _KIND_LOW_LEVEL
+            names[_OPS_MODULES[lop][1]].append(op_name)
+        kinds.update({f"{ops_str}{op.name}": kind for op, kind in _SPECIAL_KINDS.items()})
+        self.ops = MappingProxyType(ops)
+        self.kinds = MappingProxyType(kinds)
+        self.modules = MappingProxyType(modules)  # op name -> module of the built-in operators
+        self.names = {attr: tuple(op_names) for attr, op_names in names.items()}
+        self.attrs = {f"op__{op_class.name}": op_name for op_name, op_class in ops.items()}
+
+
+@lru_cache(maxsize=64)
+def _operator_registry(ops_str: str, ops_custom: tuple) -> _OperatorRegistry:
+    return _OperatorRegistry(ops_str, ops_custom)
+
+
+class _SearchContext:
+    """Evaluation state for a single DictSearch call, kept apart so one instance can be shared between threads"""
+
+    __slots__ = ("initial_data", "used", "search", "empty", "owned", "evaluated")
+
+    def __init__(self, initial_data, used=None, search=None):
+        self.initial_data = initial_data
+        self.used = used
+        self.search = search  # operator wrappers reach the search through it, so plans are not bound to an instance
+        self.empty = False
+        self.evaluated = 0  # match tests run by the interpreter
+        self.owned = {}  # id -> dict built or copied during this call, safe to write into, kept alive to pin its id
+
+
+def _element_context(d_point, ctx: _SearchContext) -> _SearchContext:
+    """'$where' evaluates its sub query with each element as the root document, as a search of its own would"""
+    return _SearchContext(d_point, ctx.used, ctx.search)
+
+
+class MatchStats:
+    """Match tests run per document by the interpreter, collected while set as 'DictSearch.match_stats'
+
+    Updates are not synchronized, use one instance per thread when sharing a DictSearch between threads.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.evaluated = 0
+        self.histogram = Counter()  # tests run -> documents
+
+    def record(self, evaluated: int):
+        self.documents += 1
+        self.evaluated += evaluated
+        self.histogram[evaluated] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.evaluated / self.documents if self.documents else 0.0
+
+
+class _MatchPlan:
+    """What assigning a match query builds, kept in the plan cache to be reused by other instances"""
+
+    __slots__ = ("parsed", "compiled", "operators", "paths")
+
+    def __init__(self, parsed: dict, compiled: Union[Callable, None], operators: dict, paths: dict):
+        self.parsed = parsed
+        self.compiled = compiled
+        self.operators = operators
+        self.paths = paths
+
+
+class _InnerEqual(lop.Equal):
+    """Equality against a value given on each call, used for values reached without an explicit operator"""
+
+    def implementation(self, data, comp) -> bool:
+        return comp == data
+
+
 def _copy_data(func):
     def wrapper(*args, **kwargs):
         try:
@@ -32,13 +168,13 @@ def _copy_data(func):
 
 
 class DictSearch:
-    def __assign_consumed_iterator(self, data, prev_keys):
+    def __assign_consumed_iterator(self, data, prev_keys, ctx: _SearchContext):
         if not self.consumable_iterators or not isinstance(data, self.consumable_iterators):
             return data
         if self.non_consumable_iterators and isinstance(data, self.non_consumable_iterators):
             return data
         data = self.consumable_cast_type.__call__(data)
-        utils.set_from_list(self._initial_data, prev_keys, data)
+        utils.set_from_list(ctx.initial_data, prev_keys, data)
         return data
 
     def __init__(
@@ -55,6 +191,8 @@ class DictSearch:
         consumable_cast_type=list,
         coerce_list=False,
         sel_array_ignored_types=None,
+        compile_match=False,
+        reorder_match=False,
     ):
         self.ops_str = ops_str
         self.container_type = container_type
@@ -63,81 +201,167 @@ class DictSearch:
         self.consumable_cast_type = consumable_cast_type
         self.coerce_list = coerce_list
         self.sel_array_ignored_types = sel_array_ignored_types
-        self._initial_data = {}
-
-        self.all_match_ops: dict[str, Type[Operator]] = {}
-        self.__wrapped_ops: dict[str, Callable] = {}
-        self.low_level_operators = self._load_ops_from_module(lop)
-        self.high_level_operators = self._load_ops_from_module(hop, self.__wrap_high_level_op_impl)
-        self.array_operators = self._load_ops_from_module(aop, self.__wrap_array_ops_impl)
-        self.array_selectors = self._load_ops_from_module(asop, self.__wrap_array_selectors_impl)
-        self.count_operators = self._load_ops_from_module(cop, self.__wrap_count_ops_impl)
-        self.match_operators = self._load_ops_from_module(mop, self.__wrap_match_ops_impl)
-        self.__set_ops_custom(ops_custom or [])
-        self.__set_ops_names_attrs()
-        self.used_operators = []
+        self._compile_match = compile_match
+        self.reorder_match = reorder_match
+        self.match_pass_rates: dict = {}
+        self.match_stats: Union[MatchStats, None] = None
+
+        self.__ops_key = (ops_str, self.__validate_ops_custom(ops_custom or []))
+        registry = _operator_registry(*self.__ops_key)
+        self.all_match_ops: abc.Mapping[str, Type[Operator]] = registry.ops
+        self._ops_kinds: abc.Mapping[str, str] = registry.kinds
+        self.__ops_modules = registry.modules
+        self.__dict__.update(registry.names)
+        self.__dict__.update(registry.attrs)
+        self.__ops_wrappers = {
+            hop: (self.__wrap_high_level_op_impl, self.__wrap_compiled_high_level_op_impl),
+            aop: (self.__wrap_array_ops_impl, self.__wrap_compiled_array_ops_impl),
+            asop: (self.__wrap_array_selectors_impl, self.__wrap_array_selectors_impl),
+            cop: (self.__wrap_count_ops_impl, self.__wrap_compiled_array_ops_impl),
+            mop: (self.__wrap_match_ops_impl, self.__wrap_compiled_high_level_op_impl),
+        }
+        self.__match_operators: dict = {}
+        self.__select_operators: dict = {}
+        self.__parsed_operators: dict = self.__match_operators
+        self.__match_paths: dict = {}
+        self.__match_plan_shared = False
+        self.__match_planned = False
 
         # select attributes
         self.sel_array = f"{self.ops_str}array"
         self.sel_include = 1
         self.sel_exclude = 0
-        self._empty = False
         self._used = None
         self.selection_operators = [self.sel_include, self.sel_exclude]
 
         self.ops_init_config = self.__parse_ops_init_config(ops_init_config or {})
-        self.__inner_call__ = lambda x: x
+        self.__inner_call__ = lambda x, ctx: x
         self._call_layers: dict = {
             self.__wrap_select: None,
             self.__wrap_match: None,
         }
-        self.inner_eq_op = self.__configure_operator(self.op__eq, lop.Equal(None))
+        self.inner_eq_op = self.__configure_operator(self.op__eq, _InnerEqual(None))
         self.match_query_parsed: dict = {}
+        self.match_query_compiled: Union[Callable, None] = None
         self.match_query: dict = match_query
         self.select_query: dict = select_query
 
-    def _load_ops_from_module(self, ops_module: ModuleType, wrapper: Callable = None) -> list[str]:
+    def _load_ops_from_module(
+        self,
+        ops_module: ModuleType,
+        wrapper: Callable = None,
+        compiled_wrapper: Callable = None,
+        kind: str = _KIND_LOW_LEVEL,
+    ) -> list[str]:
+        """Add the operators of another module to this instance only, the shared registry is copied on write"""
         op_names = []
+        ops, kinds, modules = dict(self.all_match_ops), dict(self._ops_kinds), dict(self.__ops_modules)
         for op_class in get_operators(ops_module):
             op_name = self.__build_op_name(op_class.name)
-            if op_name in self.all_match_ops:
-                raise exceptions.LoadOpsError(self.all_match_ops[op_name], op_name, op_class, ops_module)
-            self.all_match_ops[op_name] = op_class
+            if op_name in ops:
+                raise exceptions.LoadOpsError(ops[op_name], op_name, op_class, ops_module)
+            ops[op_name], kinds[op_name], modules[op_name] = op_class, kind, ops_module
             op_names.append(op_name)
-            if wrapper:
-                self.__wrapped_ops[op_name] = wrapper
+        self.__ops_wrappers[ops_module] = (wrapper, compiled_wrapper)
+        self.all_match_ops, self._ops_kinds, self.__ops_modules = ops, kinds, modules
+        self.__dict__.update({f"op__{ops[op_name].name}": op_name for op_name in op_names})
         return op_names
 
     def __build_op_name(self, op_name: str) -> str:
         return f"{self.ops_str}{op_name}"
 
-    def __set_ops_custom(self, ops_custom: Union[Type[Operator], list[..., Type[Operator]]]):
+    @staticmethod
+    def __validate_ops_custom(ops_custom: Union[Type[Operator], list[..., Type[Operator]]]) -> tuple:
         ops_custom = ops_custom if isinstance(ops_custom, list) else [ops_custom]
         for op in ops_custom:
             if not isinstance(op, type) or not issubclass(op, Operator):
                 raise exceptions.CustomOpsValueError
-            op_name = self.__build_op_name(op.name)
-            if op_name in self.all_match_ops:
-                raise exceptions.CustomOpsExistingKey(op_name)
-            self.all_match_ops[op_name] = op
-            self.low_level_operators.append(op_name)
-
-    def __set_ops_names_attrs(self):
-        for op_name, op_class in self.all_match_ops.items():
-            setattr(self, f"op__{op_class.name}", op_name)
+        return tuple(ops_custom)
 
     def __parse_ops_init_config(self, config: dict):
         return {self.__build_op_name(k) if isinstance(k, str) else k: v for k, v in config.items()}
 
+    def __getstate__(self) -> dict:
+        """The current settings and raw queries, changes made to the parsed operator instances are not shipped"""
+        if self.all_match_ops is not _operator_registry(*self.__ops_key).ops:
+            raise exceptions.PickleStateError("operators loaded with '_load_ops_from_module'")
+        if self.match_pass_rates:
+            raise exceptions.PickleStateError("the match query order measured by 'plan_match' on a sample")
+        return self._spec()
+
+    def __setstate__(self, spec: dict):
+        self.__init__(**{k: v for k, v in spec.items() if k not in ["match_query", "select_query", "match_planned"]})
+        self._match_query, self._select_query = spec["match_query"], spec["select_query"]
+        self.__match_planned = spec["match_planned"]
+        self.__inner_call__ = self.__build_on_first_call
+
+    def __build_on_first_call(self, data, ctx):
+        """Parse the queries of an unpickled search the first time it is used"""
+        planned = self.__match_planned
+        self.match_query, self.select_query = self.match_query, self.select_query
+        if planned:
+            self.plan_match()
+        return self(data)
+
     def __call__(self, data) -> Union[dict, None]:
-        self._initial_data = data
         if isinstance(data, dict):
-            return self.__inner_call__(data)
+            return self.__inner_call__(data, _SearchContext(data, self._used, self))
+
+    def filter(self, data: abc.Iterable):
+        """Return a filter object with only the valid members of the passed iterable
 
-    def filter(self, data: abc.Collection):
-        """Return a filter object with only the valid members of the passed Collection"""
+        Documents are evaluated one at a time as the filter object is consumed, so 'data' can be a generator or a
+        file reader of any size. Nested arrays of the current document are still materialized by:
+        - array operators and array selectors, when the array is one of 'consumable_iterators'
+          (it is cast with 'consumable_cast_type' and written back into the document)
+        - '$where' when matching, which builds the list of elements its sub query is applied to
+        - '$array', '$where', '$index' and '$slice' when selecting, which build the selected list
+        """
+        self.__start_batch()
+        if isinstance(data, (indexing.IndexedCollection, columnar.ColumnarCollection)):
+            return data.filter(self)
         return filter(lambda x: x is not None, map(self, data))
 
+    def __start_batch(self):
+        for op in self.__iter_operators():
+            if op.cache == BATCH_CACHE:
+                op.clear_cache()
+
+    @staticmethod
+    def build_index(data: abc.Iterable, paths: list) -> indexing.IndexedCollection:
+        """Index the values found at 'paths' (lists of keys) so 'filter' only evaluates the candidate documents"""
+        return indexing.IndexedCollection(data, paths)
+
+    def parallel_filter(self, data: abc.Iterable, workers: int = None, chunksize: int = 1000, ordered: bool = True):
+        """Like 'filter' but evaluating chunks of 'data' in a pool of 'workers' processes
+
+        The search is pickled once per worker, so its queries and constructor arguments must be picklable,
+        as must the documents and their results. With 'ordered=False' results are yielded as chunks complete.
+        """
+        return parallel.parallel_filter(self, data, workers, chunksize, ordered)
+
+    def _spec(self) -> dict:
+        ops_str, ops_custom = self.__ops_key
+        return dict(
+            match_query=self.match_query,
+            select_query=self.select_query,
+            ops_str=ops_str,
+            ops_custom=list(ops_custom),
+            ops_init_config={
+                k[len(ops_str) :] if isinstance(k, str) and k.startswith(ops_str) else k: v
+                for k, v in self.ops_init_config.items()
+            },
+            container_type=self.container_type,
+            consumable_iterators=self.consumable_iterators,
+            non_consumable_iterators=self.non_consumable_iterators,
+            consumable_cast_type=self.consumable_cast_type,
+            coerce_list=self.coerce_list,
+            sel_array_ignored_types=self.sel_array_ignored_types,
+            compile_match=self.compile_match,
+            reorder_match=self.reorder_match,
+            match_planned=self.__match_planned,
+        )
+
     def __set_call_layer(self, value, func):
         if value is None:
             self._call_layers[func] = None
@@ -149,18 +373,51 @@ class DictSearch:
         return value
 
     def __layer_funcs(self):
-        self.__inner_call__ = lambda x: x
+        self.__inner_call__ = lambda x, ctx: x
         for val in self._call_layers.values():
             if val:
                 self.__inner_call__ = val(self.__inner_call__)
 
+    def __iter_operators(self) -> abc.Iterator[Operator]:
+        for registry in [self.__match_operators, self.__select_operators]:
+            for ops in registry.values():
+                yield from ops
+
+    def __own_match_plan(self):
+        """Parse a private copy of a plan taken from or put in the plan cache, before changing or exposing it"""
+        if self.__match_plan_shared:
+            self.__build_match_plan(self.match_query)
+            self.__match_plan_shared = False
+
+    @property
+    def used_operators(self) -> list:
+        """Operators instantiated by the current match and select queries
+
+        A match query plan shared through the plan cache is parsed again for this instance first, so changes made
+        to these operators never reach other searches. The new operators start with empty caches and counters, get
+        them before evaluating documents to follow those.
+        """
+        self.__own_match_plan()
+        return list(self.__iter_operators())
+
     def get_operator(self, name: str, filter_dict: dict = None, first=True) -> Union[Operator, list]:
-        operators = [op for op in self.used_operators if op.name == name]
+        """Operators of the current queries named 'name', private to this instance like those of 'used_operators'"""
+        self.__own_match_plan()
+        operators = self.__match_operators.get(name, []) + self.__select_operators.get(name, [])
         if filter_dict:
             operators = [op for op in operators if all(getattr(op, k) == v for k, v in filter_dict.items())]
         if operators:
             return operators[0] if first else operators
 
+    @property
+    def compile_match(self) -> bool:
+        return self._compile_match
+
+    @compile_match.setter
+    def compile_match(self, value: bool):
+        self._compile_match = value
+        self.match_query, self.select_query = self.match_query, self.select_query
+
     @property
     def match_query(self):
         return self._match_query
@@ -168,13 +425,108 @@ class DictSearch:
     @match_query.setter
     def match_query(self, value):
         self._match_query = self.__set_call_layer(value, self.__wrap_match)
+        self.match_pass_rates = {}
+        self.__match_planned = False
+        key = self.__match_plan_key(value)
+        plan = plan_cache.PLAN_CACHE.get(key) if key is not None else None
+        if plan is not None:
+            self.match_query_parsed, self.match_query_compiled = plan.parsed, plan.compiled
+            self.__parsed_operators = self.__match_operators = plan.operators
+            self.__match_paths = plan.paths
+        else:
+            self.__build_match_plan(value)
+            if key is not None:
+                plan = _MatchPlan(
+                    self.match_query_parsed, self.match_query_compiled, self.__match_operators, self.__match_paths
+                )
+                plan_cache.PLAN_CACHE.put(key, plan)
+        self.__match_plan_shared = key is not None
+
+    def __match_plan_key(self, value) -> Union[tuple, None]:
+        """Key of the plan of 'value' in the plan cache, None if it can not be cached"""
+        if not value or not plan_cache.PLAN_CACHE.maxsize:
+            return None
+        if self.all_match_ops is not _operator_registry(*self.__ops_key).ops:  # operators loaded into this instance
+            return None
+        try:
+            query, config = plan_cache.canonical_form(value), plan_cache.canonical_form(self.ops_init_config)
+        except TypeError:
+            return None
+        return query, config, self.__ops_key, bool(self.compile_match), bool(self.reorder_match)
+
+    def __build_match_plan(self, value):
+        self.__parsed_operators = self.__match_operators = {}
+        self.__match_paths = {}
         if value:
             self.match_query_parsed = self._parse_match_query(deepcopy(value))
+            self.__collect_match_paths(self.match_query_parsed)
+            if self.reorder_match:
+                planner.plan_match(self.match_query_parsed)
+        if value is not None and self.compile_match:
+            self.match_query_compiled = self._compile_match_query(self.match_query_parsed)
+
+    def __collect_match_paths(self, match_dict):
+        """Map the ids of parsed dicts heading a chain of nested keys to the whole path and the dict ending it"""
+        for key, node in match_dict.items():
+            if isinstance(node, dict):
+                sub_keys, last = _collapse_path(node)
+                if sub_keys:
+                    self.__match_paths[id(node)] = ((key, *sub_keys), last)
+                self.__collect_match_paths(last)
+            elif isinstance(node, MatchNode):
+                search_val = getattr(node.operator, "search_val", None)
+                for query in [*(node.query if isinstance(node.query, list) else [node.query]), search_val]:
+                    if isinstance(query, dict):
+                        self.__collect_match_paths(query)
+
+    def plan_match(self, sample: abc.Iterable = None):
+        """Reorder the parsed match query so cheap and selective tests short-circuit first
+
+        With a 'sample' of documents the pass rate of every ranked test is measured on it (a test raising counts as
+        failed) and kept in 'match_pass_rates' until the next assignment of 'match_query', otherwise it is guessed
+        from the operators. Consumable iterators of the sample documents are cast as in a normal search.
+        """
+        if not self.match_query:
+            return
+        self.__own_match_plan()
+        self.__match_planned = True
+        if sample is not None:
+            self.match_pass_rates = self.__sample_pass_rates(list(sample))
+        planner.plan_match(self.match_query_parsed, self.match_pass_rates)
+        if self.compile_match:
+            self.match_query_compiled = self._compile_match_query(self.match_query_parsed)
+
+    def __sample_pass_rates(self, sample: list) -> dict:
+        pass_rates = {}
+        for value_id, match_dict in planner.iter_predicates(self.match_query_parsed):
+            if self.compile_match:
+                predicate = self._compile_match_query(match_dict)
+            else:
+                predicate = lambda data, ctx: self._match(data, match_dict, ctx) is not None
+            passed = 0
+            for d_point in sample:
+                try:
+                    passed += bool(predicate(d_point, _SearchContext(d_point, self._used, self)))
+                except Exception:
+                    continue
+            pass_rates[value_id] = passed / len(sample) if sample else planner.DEFAULT_PASS_RATE
+        return pass_rates
 
     def __wrap_match(self, func):
-        def wrapper(data):
-            if self._match(data, self.match_query_parsed):
-                return func(data)
+        if self.compile_match:
+
+            def wrapper(data, ctx):
+                if self.match_query_compiled(data, ctx):
+                    return func(data, ctx)
+
+        else:
+
+            def wrapper(data, ctx):
+                matched = self._match(data, self.match_query_parsed, ctx)
+                if self.match_stats is not None:
+                    self.match_stats.record(ctx.evaluated)
+                if matched:
+                    return func(data, ctx)
 
         return wrapper
 
@@ -184,8 +536,11 @@ class DictSearch:
             if k in self.all_match_ops:
                 node = self.all_match_ops[k].init_match_node(v, self._parse_match_query)
                 node.operator = self.__configure_operator(k, node.operator)
+                node.kind = self._ops_kinds[k]
+                if node.kind == _KIND_WHERE and not isinstance(node.operator.search_val, (dict, type(None))):
+                    raise exceptions.PreconditionError
                 parsed_match_query[k] = node
-                self.used_operators.append(node.operator)
+                self.__parsed_operators.setdefault(node.operator.name, []).append(node.operator)
             elif isinstance(v, dict):
                 parsed_match_query[k] = v
                 self._parse_match_query(v, parsed_match_query[k])
@@ -193,12 +548,14 @@ class DictSearch:
                 node = self.all_match_ops[self.op__eq].init_match_node(v)
                 self.__configure_operator(k, node.operator)
                 parsed_match_query[k] = node
-                self.used_operators.append(node.operator)
+                self.__parsed_operators.setdefault(node.operator.name, []).append(node.operator)
         return parsed_match_query
 
     def __configure_operator(self, op_name, op_instance: Operator) -> Operator:
-        if op_name in self.__wrapped_ops:
-            op_instance.implementation = self.__wrapped_ops[op_name](op_instance.implementation)
+        wrapper, compiled_wrapper = self.__ops_wrappers.get(self.__ops_modules.get(op_name), (None, None))
+        wrapper = compiled_wrapper if self.compile_match else wrapper
+        if wrapper:
+            op_instance.implementation = wrapper(op_instance.implementation)
             op_instance.original_implementation = op_instance.implementation
         self.__set_from_config(op_name, op_instance)
         return op_instance
@@ -217,85 +574,186 @@ class DictSearch:
             else:
                 raise exceptions.OpsConfigKeyError(k, op_instance.name, config_key)
 
-    def _match(self, data, match_query):
-        if all(self._apply_match(data, match_query)):
+    def _match(self, data, match_query, ctx: _SearchContext):
+        if self._apply_match(data, match_query, ctx):
             return data
 
-    def _apply_match(self, data, match_dict, prev_keys=None):
+    def _apply_match(self, data, match_dict, ctx: _SearchContext, prev_keys=None) -> bool:
+        """Evaluate the tests of 'match_dict' in order, returning False as soon as one of them fails"""
+        if not isinstance(match_dict, dict) or not match_dict:
+            ctx.evaluated += 1
+            return bool(self.inner_eq_op.implementation(data, match_dict))
         prev_keys = prev_keys if prev_keys else []
-        if isinstance(match_dict, dict) and match_dict:
-            for key, node in match_dict.items():
-                if key == self.op__comp:
-                    yield node.operator.implementation(data, self._initial_data)
-                elif key == self.op__find:
-                    yield from self._apply_match(node.operator(data), node.query, prev_keys)
-                elif key == self.op__where:
-                    yield from self._apply_match(node.operator.implementation(data, prev_keys, self), node.query)
-                elif key in self.low_level_operators:
-                    yield node.operator.implementation(data)
-                elif (
-                    key
-                    in self.high_level_operators + self.match_operators + self.array_operators + self.count_operators
-                ):
-                    yield node.operator.implementation(data, node.query, prev_keys)
-                elif key in self.array_selectors:
-                    yield from self._apply_match(node.operator.implementation(data, prev_keys), node.query)
-                elif not isinstance(data, dict) or isinstance(data, dict) and key not in data.keys():
-                    yield False
-                elif isinstance(node, dict):
-                    prev_keys.append(key)
-                    yield from self._apply_match(data[key], node, prev_keys)
-                    prev_keys.pop(-1)
-                else:
-                    yield node.operator.implementation(data[key])
-        else:
-            self.inner_eq_op.comp = match_dict
-            yield self.inner_eq_op.implementation(data)
+        for key, node in match_dict.items():
+            kind = getattr(node, "kind", None)
+            if kind is None and isinstance(node, dict):
+                path, node = self.__match_paths.get(id(node)) or ((key,), node)
+                value = data
+                for path_key in path:
+                    if not isinstance(value, dict) or path_key not in value:
+                        ctx.evaluated += 1
+                        return False
+                    value = value[path_key]
+                prev_keys.extend(path)
+                result = self._apply_match(value, node, ctx, prev_keys)
+                del prev_keys[-len(path) :]
+                if not result:
+                    return False
+                continue
+            ctx.evaluated += 1
+            if kind == _KIND_LOW_LEVEL:
+                result = node.operator.implementation(data)
+            elif kind == _KIND_HIGH_LEVEL or kind == _KIND_ARRAY:
+                result = node.operator.implementation(data, node.query, prev_keys, ctx)
+            elif kind == _KIND_ARRAY_SELECTOR:
+                result = self._apply_match(node.operator.implementation(data, prev_keys, ctx), node.query, ctx)
+            elif kind == _KIND_COMP:
+                result = node.operator.implementation(data, ctx.initial_data)
+            elif kind == _KIND_FIND:
+                result = self._apply_match(node.operator(data), node.query, ctx, prev_keys)
+            elif kind == _KIND_WHERE:
+                match_func = lambda d_point, query: self._apply_match(d_point, query, _element_context(d_point, ctx))
+                matched = node.operator.implementation(data, prev_keys, ctx, match_func)
+                result = self._apply_match(matched, node.query, ctx)
+            elif not isinstance(data, dict) or key not in data:
+                return False
+            else:
+                result = node.operator.implementation(data[key])
+            if not result:
+                return False
+        return True
+
+    def _compile_match_query(self, match_dict, prev_keys: tuple = ()) -> Callable:
+        """Build a single predicate for a parsed match query with every dispatch decision already taken"""
+        if not isinstance(match_dict, dict) or not match_dict:
+            eq_op = self.__configure_operator(self.op__eq, lop.Equal(match_dict))
+            eq_op.cache = None  # unregistered, so never emptied between batches, like inner_eq_op it is not memoized
+            return lambda data, ctx: eq_op.implementation(data)
+        predicates = [self.__compile_match_key(key, node, prev_keys) for key, node in match_dict.items()]
+        if len(predicates) == 1:
+            return predicates[0]
+
+        def match_all(data, ctx):
+            for predicate in predicates:
+                if not predicate(data, ctx):
+                    return False
+            return True
+
+        return match_all
+
+    def __compile_match_key(self, key, node, prev_keys: tuple) -> Callable:
+        kind = getattr(node, "kind", None)
+        if kind == _KIND_COMP:
+            op = node.operator
+            return lambda data, ctx: op.implementation(data, ctx.initial_data)
+        elif kind == _KIND_FIND:
+            op, sub_predicate = node.operator, self._compile_match_query(node.query, prev_keys)
+            return lambda data, ctx: sub_predicate(op.implementation(data), ctx)
+        elif kind == _KIND_WHERE:
+            op, sub_predicate = node.operator, self._compile_match_query(node.query)
+            where_predicate = self._compile_match_query(op.search_val)
+            match_element = lambda d_point, ctx: where_predicate(d_point, _element_context(d_point, ctx))
+            return lambda data, ctx: sub_predicate(
+                op.implementation(data, prev_keys, ctx, lambda d_point, _: match_element(d_point, ctx)), ctx
+            )
+        elif kind == _KIND_LOW_LEVEL:
+            op = node.operator
+            return lambda data, ctx: op.implementation(data)
+        elif kind == _KIND_HIGH_LEVEL:
+            op = node.operator
+            sub_predicates = [self._compile_match_query(search_dict, prev_keys) for search_dict in node.query]
+            return lambda data, ctx: op.implementation(data, sub_predicates, prev_keys, ctx)
+        elif kind == _KIND_ARRAY:
+            op, sub_predicate = node.operator, self._compile_match_query(node.query, prev_keys)
+            return lambda data, ctx: op.implementation(data, sub_predicate, prev_keys, ctx)
+        elif kind == _KIND_ARRAY_SELECTOR:
+            op, sub_predicate = node.operator, self._compile_match_query(node.query)
+            return lambda data, ctx: sub_predicate(op.implementation(data, prev_keys, ctx), ctx)
+        elif isinstance(node, dict):
+            sub_keys, node = _collapse_path(node)
+            path = (key, *sub_keys)
+            sub_predicate = self._compile_match_query(node, (*prev_keys, *path))
+            if not sub_keys:
+                return lambda data, ctx: isinstance(data, dict) and key in data and sub_predicate(data[key], ctx)
+
+            def match_path(data, ctx):
+                for path_key in path:
+                    if not isinstance(data, dict) or path_key not in data:
+                        return False
+                    data = data[path_key]
+                return sub_predicate(data, ctx)
+
+            return match_path
+        op = node.operator
+        return lambda data, ctx: isinstance(data, dict) and key in data and op.implementation(data[key])
+
+    @staticmethod
+    def __wrap_compiled_high_level_op_impl(func):
+        def wrapper(data, sub_predicates, prev_keys, ctx):
+            return func(bool(predicate(data, ctx)) for predicate in sub_predicates)
+
+        return wrapper
+
+    @staticmethod
+    def __wrap_compiled_array_ops_impl(func):
+        def wrapper(data, sub_predicate, prev_keys, ctx):
+            if not isinstance(data, abc.Iterable) or not data:
+                return False
+            data = ctx.search.__assign_consumed_iterator(data, prev_keys, ctx)
+            return func(bool(sub_predicate(d_point, ctx)) for d_point in data)
 
-    def __wrap_high_level_op_impl(self, func):
-        def wrapper(data, value, prev_keys):
-            iterable = iter(all(self._apply_match(data, search_dict, prev_keys)) for search_dict in value)
+        return wrapper
+
+    @staticmethod
+    def __wrap_high_level_op_impl(func):
+        def wrapper(data, value, prev_keys, ctx):
+            iterable = iter(ctx.search._apply_match(data, search_dict, ctx, prev_keys) for search_dict in value)
             return func(iterable)
 
         return wrapper
 
-    def __wrap_match_ops_impl(self, func):
-        def wrapper(data, match_query, prev_keys):
-            iterable = iter(all(self._apply_match(data, search_dict, prev_keys)) for search_dict in match_query)
+    @staticmethod
+    def __wrap_match_ops_impl(func):
+        def wrapper(data, match_query, prev_keys, ctx):
+            iterable = iter(ctx.search._apply_match(data, search_dict, ctx, prev_keys) for search_dict in match_query)
             return func(iterable)
 
         return wrapper
 
-    def __wrap_array_ops_impl(self, func):
-        def wrapper(data, value, prev_keys):
+    @staticmethod
+    def __wrap_array_ops_impl(func):
+        def wrapper(data, value, prev_keys, ctx):
             if not isinstance(data, abc.Iterable) or not data:
                 return False
-            data = self.__assign_consumed_iterator(data, prev_keys)
-            iterable = iter(all(self._apply_match(d_point, value, prev_keys)) for d_point in data)
+            data = ctx.search.__assign_consumed_iterator(data, prev_keys, ctx)
+            iterable = iter(ctx.search._apply_match(d_point, value, ctx, prev_keys) for d_point in data)
             return func(iterable)
 
         return wrapper
 
-    def __wrap_count_ops_impl(self, func):
-        def wrapper(data, match_query, prev_keys):
+    @staticmethod
+    def __wrap_count_ops_impl(func):
+        def wrapper(data, match_query, prev_keys, ctx):
             if not isinstance(data, abc.Iterable) or not data:
                 return False
-            data = self.__assign_consumed_iterator(data, prev_keys)
-            iterable = iter(all(self._apply_match(data_point, match_query, prev_keys)) for data_point in data)
+            data = ctx.search.__assign_consumed_iterator(data, prev_keys, ctx)
+            iterable = iter(ctx.search._apply_match(data_point, match_query, ctx, prev_keys) for data_point in data)
             return func(iterable)
 
         return wrapper
 
-    def __wrap_array_selectors_impl(self, func):
-        def wrapper(data, prev_keys, *args):
-            data = self.__assign_consumed_iterator(data, prev_keys)
+    @staticmethod
+    def __wrap_array_selectors_impl(func):
+        def wrapper(data, prev_keys, ctx, *args):
+            data = ctx.search.__assign_consumed_iterator(data, prev_keys, ctx)
             return func(data, *args)
 
         return wrapper
 
-    def _select(self, data, selection_dict):
+    def _select(self, data, plan: list, ctx: _SearchContext):
         selected_dict = {}
-        self._apply_selection(data, selection_dict, selected_dict)
+        ctx.owned[id(selected_dict)] = selected_dict
+        self._apply_plan(data, plan, selected_dict, ctx)
         return selected_dict
 
     @property
@@ -303,11 +761,10 @@ class DictSearch:
         return self._select_query
 
     def __wrap_select(self, func):
-        def wrapper(data):
-            self._empty = False
-            result = self._select(data, self.select_query)
-            if result or self._empty:
-                return func(result)
+        def wrapper(data, ctx):
+            result = self._select(data, self.select_plan, ctx)
+            if result or ctx.empty:
+                return func(result, ctx)
 
         return wrapper
 
@@ -315,8 +772,11 @@ class DictSearch:
     def select_query(self, value):
         self._used = None
         self._select_query = self.__set_call_layer(value, self.__wrap_select)
+        self.select_plan = []
+        self.__parsed_operators = self.__select_operators = {}
         if isinstance(value, dict):
             self.__parse_select_query(value)
+            self.select_plan = self._compile_select_query(value)
 
     def __parse_select_query(self, select_query):
         for k, v in select_query.items():
@@ -332,92 +792,150 @@ class DictSearch:
                 elif self._used != v:
                     raise exceptions.SelectMixedError
 
-    def _apply_selection(self, data, selection_dict, selected_dict, prev_keys=None, original_data=None):
-        prev_keys = prev_keys if prev_keys else []
-        original_data = original_data if original_data else data.copy()
-        if not isinstance(selection_dict, dict) or not data:
-            return
+    def _compile_select_query(self, selection_dict, prev_keys: tuple = ()) -> list:
+        """Flatten a selection dict into a projection plan
+
+        Each step is a tuple (kind, parent_keys, keys, payload), where 'parent_keys' is the path of the value the step
+        applies to and 'keys' the path written into the selected dict. Sibling steps share the same 'parent_keys'
+        tuple so the parent is resolved once per document. Array operators carry their own sub-plans.
+        """
+        plan = []
+        if not isinstance(selection_dict, dict):
+            return plan
         for key, val in selection_dict.items():
-            if key == self.op__where and prev_keys and isinstance(data, abc.Iterable):
-                self._operator_sel_where(data, val, selected_dict, prev_keys, original_data)
-            elif key == self.op__index and prev_keys and isinstance(data, abc.Iterable):
-                self._operator_sel_index(data, val, selected_dict, prev_keys, original_data)
-            elif key == self.op__slice and prev_keys and isinstance(data, abc.Iterable):
-                self._operator_sel_slice(data, val, selected_dict, prev_keys, original_data)
-            elif key == self.sel_array and isinstance(data, abc.Iterable):
-                if self.sel_array_ignored_types and isinstance(data, self.sel_array_ignored_types):
-                    continue
-                self._apply_to_container(data, selection_dict[key], selected_dict, prev_keys, original_data)
-            elif not isinstance(data, dict) or key not in data:
-                continue
-            elif val in self.selection_operators and isinstance(data, dict):
-                prev_keys.append(key)
-                self._build_dict(val, data[key], selected_dict, prev_keys, original_data)
-                prev_keys.pop(-1)
+            if key == self.op__where and prev_keys:
+                plan.append((_SEL_WHERE, prev_keys, prev_keys, self.__compile_sel_where(val)))
+            elif key == self.op__index and prev_keys:
+                plan.append((_SEL_INDEX, prev_keys, prev_keys, self.__compile_sel_index(val)))
+            elif key == self.op__slice and prev_keys:
+                plan.append((_SEL_SLICE, prev_keys, prev_keys, self.__compile_sel_slice(val)))
+            elif key == self.sel_array:
+                plan.append((_SEL_ARRAY, prev_keys, prev_keys, self._compile_select_query(val)))
+            elif val in self.selection_operators:
+                plan.append((_SEL_FIELD, prev_keys, prev_keys + (key,), val))
             else:
-                prev_keys.append(key)
-                self._apply_selection(data[key], val, selected_dict, prev_keys, original_data)
-                prev_keys.pop(-1)
+                plan.extend(self._compile_select_query(val, prev_keys + (key,)))
+        return plan
+
+    def __compile_sub_selection(self, select_op):
+        return select_op if select_op in self.selection_operators else self._compile_select_query(select_op)
+
+    def __compile_sel_where(self, search_value) -> tuple:
+        if not isinstance(search_value, list) or len(search_value) != 2:
+            raise op_exceptions.WhereOperatorError
+        match_dict, select_op = search_value
+        parsed = self._parse_match_query(deepcopy(match_dict)) if isinstance(match_dict, dict) else match_dict
+        if self.compile_match:
+            predicate = self._compile_match_query(parsed)
+        else:
+            predicate = lambda data, ctx: self._match(data, parsed, ctx) is not None
+        return predicate, self.__compile_sub_selection(select_op)
 
-    def _select_iter(self, data, selection_dict):
+    def __compile_sel_index(self, select_op) -> tuple:
+        if isinstance(select_op, list) and len(select_op) == 2:
+            index, select_op = select_op[0], select_op[1]
+        elif isinstance(select_op, dict) and len(select_op) == 1:
+            index, select_op = list(select_op.items())[0]
+        else:
+            raise op_exceptions.IndexOperatorError
+        return self.all_match_ops[self.op__index](index), self.__compile_sub_selection(select_op)
+
+    def __compile_sel_slice(self, select_op) -> tuple:
+        slice_str, select_op = list(select_op.items())[0]
+        return self.all_match_ops[self.op__slice](slice_str), self.__compile_sub_selection(select_op)
+
+    @staticmethod
+    def __resolve_parent(data, keys: tuple):
+        for key in keys:
+            if not isinstance(data, dict) or key not in data:
+                return _MISSING
+            data = data[key]
+            if not data:
+                return _MISSING
+        return data
+
+    def _apply_plan(self, data, plan: list, selected_dict, ctx: _SearchContext):
+        if not data:
+            return
+        parent_keys, parent = None, None
+        for kind, step_parent_keys, keys, payload in plan:
+            if step_parent_keys is not parent_keys:
+                parent_keys, parent = step_parent_keys, self.__resolve_parent(data, step_parent_keys)
+            if parent is _MISSING:
+                continue
+            if kind == _SEL_FIELD:
+                if isinstance(parent, dict) and keys[-1] in parent:
+                    self._build_dict(payload, parent[keys[-1]], selected_dict, keys, data, ctx)
+                continue
+            parent_keys = None  # array steps may replace a consumable iterator, resolve it again for the next step
+            if not isinstance(parent, abc.Iterable):
+                continue
+            if kind == _SEL_ARRAY:
+                if self.sel_array_ignored_types and isinstance(parent, self.sel_array_ignored_types):
+                    continue
+                self._apply_to_container(parent, payload, selected_dict, keys, data, ctx)
+            elif kind == _SEL_WHERE:
+                self._operator_sel_where(parent, payload, selected_dict, keys, data, ctx)
+            elif kind == _SEL_INDEX:
+                self._operator_sel_index(parent, payload, selected_dict, keys, data, ctx)
+            elif kind == _SEL_SLICE:
+                self._operator_sel_slice(parent, payload, selected_dict, keys, data, ctx)
+
+    def _select_iter(self, data, plan: list, ctx):
         values = []
         for d_point in data:
             if not isinstance(d_point, dict) or not d_point:
                 continue
-            sel_dict = self._select(d_point, selection_dict)
+            sel_dict = self._select(d_point, plan, ctx)
             if sel_dict:
                 values.append(sel_dict)
         return values
 
-    def _apply_to_container(self, data, selection_dict, selected_dict, prev_keys, original_data):
-        values = self._select_iter(data, selection_dict)
+    def _apply_to_container(self, data, plan: list, selected_dict, prev_keys, original_data, ctx):
+        values = self._select_iter(data, plan, ctx)
         if not values:
             return
-        excl = lambda: self._exclude(selected_dict, prev_keys, original_data, values)
-        self._build_dict(self._used, values, selected_dict, prev_keys, original_data, excl_func=excl)
+        excl = lambda: self._exclude(selected_dict, prev_keys, original_data, values, ctx)
+        self._build_dict(ctx.used, values, selected_dict, prev_keys, original_data, ctx, excl_func=excl)
 
-    def _operator_sel_where(self, data, search_value, selected_dict, prev_keys, original_data):
-        if not isinstance(search_value, list) or len(search_value) != 2:
-            raise op_exceptions.WhereOperatorError
-        data = self.__assign_consumed_iterator(data, prev_keys)
+    def _operator_sel_where(self, data, compiled_where, selected_dict, prev_keys, original_data, ctx):
+        data = self.__assign_consumed_iterator(data, prev_keys, ctx)
         if len(data) == 0:
             return
-        match_dict, operator = search_value
-        if isinstance(operator, dict):
-            values = [d_point for d_point in data if self._match(d_point, match_dict) is not None]
-            self._apply_to_container(values, operator, selected_dict, prev_keys, original_data)
+        predicate, select_op = compiled_where
+        if isinstance(select_op, list):
+            values = (d_point for d_point in data if predicate(d_point, ctx))
+            self._apply_to_container(values, select_op, selected_dict, prev_keys, original_data, ctx)
         else:
-            incl = lambda: self.where_incl(match_dict, selected_dict, data, prev_keys)
-            excl = lambda: self.where_excl(match_dict, selected_dict, data, prev_keys, original_data)
-            self._build_dict(operator, None, selected_dict, prev_keys, original_data, incl_func=incl, excl_func=excl)
+            incl = lambda: self.where_incl(predicate, selected_dict, data, prev_keys, ctx)
+            excl = lambda: self.where_excl(predicate, selected_dict, data, prev_keys, original_data, ctx)
+            self._build_dict(
+                select_op, None, selected_dict, prev_keys, original_data, ctx, incl_func=incl, excl_func=excl
+            )
 
-    def where_incl(self, match_dict, selected_dict, data, prev_keys):
-        values = [d_point for d_point in data if self._match(d_point, match_dict) is not None]
-        utils.set_from_list(selected_dict, prev_keys, values) if values else None
+    def where_incl(self, predicate, selected_dict, data, prev_keys, ctx):
+        values = [d_point for d_point in data if predicate(d_point, ctx)]
+        self._set_path(selected_dict, prev_keys, values, ctx) if values else None
 
-    def where_excl(self, match_dict, selected_dict, data, prev_keys, original_data):
-        values = [d_point for d_point in data if not self._match(d_point, match_dict) is not None]
+    def where_excl(self, predicate, selected_dict, data, prev_keys, original_data, ctx):
+        values = [d_point for d_point in data if not predicate(d_point, ctx)]
         if values and values != data:
-            self._exclude(selected_dict, prev_keys, original_data, values)
+            self._exclude(selected_dict, prev_keys, original_data, values, ctx)
 
-    def _operator_sel_index(self, data, select_op, selected_dict, prev_keys, original_data):
-        if isinstance(select_op, list) and len(select_op) == 2:
-            index, select_op = select_op[0], select_op[1]
-        elif isinstance(select_op, dict) and len(select_op) == 1:
-            index, select_op = list(select_op.items())[0]
-        else:
-            raise op_exceptions.IndexOperatorError
-        data = self.__assign_consumed_iterator(data, prev_keys)
+    def _operator_sel_index(self, data, compiled_index, selected_dict, prev_keys, original_data, ctx):
+        index_op, select_op = compiled_index
+        index = index_op.index
+        data = self.__assign_consumed_iterator(data, prev_keys, ctx)
         if len(data) == 0:
             return
         if select_op in self.selection_operators:
             value = None
             if select_op == self.sel_include:
-                value = self.all_match_ops[self.op__index].implementation(data, (index, {}), prev_keys)[0]
+                value = index_op.implementation(data)
                 if value == []:  # TODO think how to signal empty value empty
                     return
-            excl = lambda: self._index_excl_simple(index, selected_dict, prev_keys, original_data, data=data)
-            self._build_dict(select_op, value, selected_dict, prev_keys, original_data, excl_func=excl)
+            excl = lambda: self._index_excl_simple(index, selected_dict, prev_keys, original_data, ctx, data=data)
+            self._build_dict(select_op, value, selected_dict, prev_keys, original_data, ctx, excl_func=excl)
             return
         index = [index] if not isinstance(index, list) else index
         values = []
@@ -430,20 +948,20 @@ class DictSearch:
                 continue
             if not isinstance(val, dict):
                 continue
-            val = self._select(val, select_op)
-            if not val and self._used == self.sel_include:
+            val = self._select(val, select_op, ctx)
+            if not val and ctx.used == self.sel_include:
                 continue
             values.append((i, val))
         if not values:
             return
-        excl = lambda: self._index_excl_nested(values, selected_dict, prev_keys, original_data, data=data)
-        incl = lambda: utils.set_from_list(
-            selected_dict, prev_keys, values[0][1] if len(values) == 1 else [v[1] for v in values]
+        excl = lambda: self._index_excl_nested(values, selected_dict, prev_keys, original_data, ctx, data=data)
+        incl = lambda: self._set_path(
+            selected_dict, prev_keys, values[0][1] if len(values) == 1 else [v[1] for v in values], ctx
         )
-        self._build_dict(self._used, None, selected_dict, prev_keys, original_data, incl_func=incl, excl_func=excl)
+        self._build_dict(ctx.used, None, selected_dict, prev_keys, original_data, ctx, incl_func=incl, excl_func=excl)
 
     @_copy_data
-    def _index_excl_simple(self, index, selected_dict, prev_keys, original_data, data=None):
+    def _index_excl_simple(self, index, selected_dict, prev_keys, original_data, ctx, data=None):
         values = self._try_coerce_list(data)
         index = [index] if not isinstance(index, list) else index
         for i in sorted(index, reverse=True):
@@ -453,10 +971,10 @@ class DictSearch:
                 continue
             except (TypeError, KeyError):
                 return
-        self._exclude(selected_dict, prev_keys, original_data, values)
+        self._exclude(selected_dict, prev_keys, original_data, values, ctx)
 
     @_copy_data
-    def _index_excl_nested(self, values, selected_dict, prev_keys, original_data, data=None):
+    def _index_excl_nested(self, values, selected_dict, prev_keys, original_data, ctx, data=None):
         data = self._try_coerce_list(data)
         for i, val in values:
             try:
@@ -465,34 +983,38 @@ class DictSearch:
                 continue
             except (KeyError, TypeError):
                 return
-        self._exclude(selected_dict, prev_keys, original_data, data)
+        self._exclude(selected_dict, prev_keys, original_data, data, ctx)
 
-    def _operator_sel_slice(self, data, select_op, selected_dict, prev_keys, original_data):
-        data = self.__assign_consumed_iterator(data, prev_keys)
+    def _operator_sel_slice(self, data, compiled_slice, selected_dict, prev_keys, original_data, ctx):
+        data = self.__assign_consumed_iterator(data, prev_keys, ctx)
         if len(data) == 0:
             return
-        slice_str, select_op = list(select_op.items())[0]
-        values = self.all_match_ops[self.op__slice].implementation(data, (slice_str, {}), prev_keys)[0]
+        slice_op, select_op = compiled_slice
+        values = slice_op.implementation(data)
         if values == []:
             return
-        if select_op in self.selection_operators:
-            func = lambda dt: exec(f"del data[{slice_str}]", {"data": dt})
-        else:
-            values = self._select_iter(values, select_op)
+        new_values = None
+        if select_op not in self.selection_operators:
+            values = new_values = self._select_iter(values, select_op, ctx)
             if not values:
                 return
-            func = lambda dt: exec(f"data[{slice_str}] = values", {"data": dt, "values": values})
-        excl = lambda: self._slice_excl(selected_dict, prev_keys, original_data, func, data=data)
-        self._build_dict(self._used or select_op, values, selected_dict, prev_keys, original_data, excl_func=excl)
+        excl = lambda: self._slice_excl(
+            slice_op.slice, new_values, selected_dict, prev_keys, original_data, ctx, data=data
+        )
+        used = select_op if ctx.used is None else ctx.used  # 0 (exclusion) is a valid mode, not a missing one
+        self._build_dict(used, values, selected_dict, prev_keys, original_data, ctx, excl_func=excl)
 
     @_copy_data
-    def _slice_excl(self, selected_dict, prev_keys, original_data, func, data=None):
+    def _slice_excl(self, slice_obj: slice, values, selected_dict, prev_keys, original_data, ctx, data=None):
         data = self._try_coerce_list(data)
         try:
-            func(data)
+            if values is None:
+                del data[slice_obj]
+            else:
+                data[slice_obj] = values
         except TypeError:
             return
-        self._exclude(selected_dict, prev_keys, original_data, data)
+        self._exclude(selected_dict, prev_keys, original_data, data, ctx)
 
     def _try_coerce_list(self, data):
         if self.coerce_list:
@@ -502,25 +1024,49 @@ class DictSearch:
                 return
         return data
 
-    @staticmethod
-    def _exclude(selected_dict, prev_keys, original_data, values):
+    def _exclude(self, selected_dict, prev_keys, original_data, values, ctx):
         if not selected_dict:
             selected_dict.update(original_data)
-        utils.set_from_list(selected_dict, prev_keys, values)
+        self._set_path(selected_dict, prev_keys, values, ctx)
+
+    @staticmethod
+    def __writable_parent(selected_dict: dict, keys, ctx: _SearchContext) -> dict:
+        """Walk to the dict holding the last key, copying the dicts on the way that are still shared with the input"""
+        parent = selected_dict
+        for key in keys[:-1]:
+            child = parent.get(key)
+            if not isinstance(child, dict) or ctx.owned.get(id(child)) is not child:
+                child = child.copy() if isinstance(child, dict) else {}
+                ctx.owned[id(child)] = child
+                parent[key] = child
+            parent = child
+        return parent
+
+    def _set_path(self, selected_dict: dict, keys, value, ctx: _SearchContext):
+        self.__writable_parent(selected_dict, keys, ctx)[keys[-1]] = value
+
+    def _pop_path(self, selected_dict: dict, keys, ctx: _SearchContext):
+        parent = selected_dict
+        for key in keys[:-1]:
+            if not isinstance(parent, dict) or key not in parent:
+                return
+            parent = parent[key]
+        if isinstance(parent, dict) and keys[-1] in parent:
+            self.__writable_parent(selected_dict, keys, ctx).pop(keys[-1])
 
-    def _build_dict(self, operator, data, selected_dict, prev_keys, original_data, incl_func=None, excl_func=None):
+    def _build_dict(self, operator, data, selected_dict, prev_keys, original_data, ctx, incl_func=None, excl_func=None):
         if not prev_keys:
             return
         if operator == self.sel_include:
-            self._used = self.sel_include
-            incl_func() if incl_func else utils.set_from_list(selected_dict, prev_keys, data)
+            ctx.used = self.sel_include
+            incl_func() if incl_func else self._set_path(selected_dict, prev_keys, data, ctx)
         elif operator == self.sel_exclude:
-            self._used = self.sel_exclude
+            ctx.used = self.sel_exclude
             if excl_func:
                 excl_func()
                 return
             if not selected_dict:
                 selected_dict.update(original_data)
             if len(prev_keys) == 1 and len(selected_dict) == 1 and prev_keys[0] in selected_dict:
-                self._empty = True
-            utils.pop_from_list(selected_dict, prev_keys)
+                ctx.empty = True
+            self._pop_path(selected_dict, prev_keys, ctx)
@@ -1,3 +1,5 @@
+from pickle import PicklingError
+
 from .operators import Operator
 
 
@@ -56,3 +58,18 @@ class OpsConfigKeyError(KeyError):
         super().__init__(
             f"\nYou provided an invalid configuration key, '{k}' for the operator '{op_name}' via '{conf_key}'.\n"
         )
+
+
+class OptionalDependencyError(ImportError):
+    def __init__(self, package, feature):
+        super().__init__(f"Install '{package}' to use '{feature}'")
+
+
+class PlanCacheSizeError(TypeError):
+    def __init__(self):
+        super().__init__("The size of the plan cache should be a non negative int")
+
+
+class PickleStateError(PicklingError):
+    def __init__(self, state):
+        super().__init__(f"This DictSearch can not be pickled, {state} would not reach the unpickled copy")
@@ -0,0 +1,156 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from operator import itemgetter
+from typing import Iterable, Iterator, Union
+
+from .operators.bases import MatchNode
+from .operators.operators import high_level_operators as hop, low_level_operators as lop
+
+# exact types whose hash is consistent with their equality, other values are always candidates
+_HASHED_TYPES = {str, int, float, bool, bytes, type(None), date, datetime, time, timedelta}
+_NUMBER_TYPES = {int, float, bool}
+_SORTED_TYPES = {str, bytes, date, datetime, time, timedelta}
+_RANGES = {
+    lop.Greater: lambda keys, comp: (bisect_right(keys, comp), None),
+    lop.GreaterEq: lambda keys, comp: (bisect_left(keys, comp), None),
+    lop.LessThen: lambda keys, comp: (None, bisect_left(keys, comp)),
+    lop.LessThenEq: lambda keys, comp: (None, bisect_right(keys, comp)),
+}
+_MISSING = object()
+
+
+def _get_path(data, path: tuple):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return _MISSING
+        data = data[key]
+    return data
+
+
+def _family(value):
+    """Values of the same family can be sorted together, None for values that are never range indexed"""
+    value_type = type(value)
+    if value_type in _NUMBER_TYPES:
+        return None if value != value else "number"
+    if value_type in _SORTED_TYPES:
+        return (value_type, value.tzinfo is None) if value_type in (datetime, time) else value_type
+    return None
+
+
+class _PathIndex:
+    """Hash and sorted indexes of the values found at one path of the documents"""
+
+    def __init__(self, data: list, path: tuple):
+        self.hashed: dict = {}
+        self.families: dict = {}
+        self.unhashed: list = []
+        self.unsorted: list = []
+        families = {}
+        for pos, d_point in enumerate(data):
+            value = _get_path(d_point, path)
+            if value is _MISSING:
+                continue
+            if type(value) in _HASHED_TYPES:
+                self.hashed.setdefault(value, []).append(pos)
+            else:
+                self.unhashed.append(pos)
+            family = _family(value)
+            if family is None:
+                self.unsorted.append(pos)
+            else:
+                families.setdefault(family, []).append((value, pos))
+        for family, entries in families.items():
+            entries.sort(key=itemgetter(0))
+            self.families[family] = ([value for value, _ in entries], [pos for _, pos in entries])
+
+    def equal(self, values: list) -> Union[set, None]:
+        if not all(type(value) in _HASHED_TYPES for value in values):
+            return None
+        candidates = set(self.unhashed)
+        for value in values:
+            candidates.update(self.hashed.get(value, []))
+        return candidates
+
+    def range(self, op_type, comp) -> Union[set, None]:
+        family = _family(comp)
+        if family is None:
+            return None
+        candidates = set(self.unsorted)
+        for other_family, (keys, positions) in self.families.items():
+            if other_family != family:
+                candidates.update(positions)
+        if family in self.families:
+            keys, positions = self.families[family]
+            candidates.update(positions[slice(*_RANGES[op_type](keys, comp))])
+        return candidates
+
+
+class IndexedCollection:
+    """A snapshot of a list of documents with hash and sorted indexes over some of their paths
+
+    Filtering it with a DictSearch first narrows the documents to the candidates of the indexed '$eq', '$in',
+    '$gt', '$gte', '$lt' and '$lte' conditions that every match must satisfy (top level fields, nested dicts and
+    '$and'), then runs the whole search over the candidates only, so the results are the same as a full scan.
+    Rebuild it after modifying the documents.
+    """
+
+    def __init__(self, data: Iterable, paths: list):
+        self.data = list(data)
+        self.paths = [tuple(path) if isinstance(path, (list, tuple)) else (path,) for path in paths]
+        self.indexes = {path: _PathIndex(self.data, path) for path in self.paths}
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def candidates(self, search) -> Union[list, None]:
+        """Sorted positions of the documents that may match 'search', None if no index applies"""
+        if not search.match_query:
+            return None
+        sets = sorted(self.__candidate_sets(search.match_query_parsed, ()), key=len)
+        if not sets:
+            return None
+        candidates = sets[0].intersection(*sets[1:])
+        return sorted(candidates)
+
+    def filter(self, search) -> Iterator:
+        """Like DictSearch.filter but evaluating only the candidate documents"""
+        candidates = self.candidates(search)
+        data = self.data if candidates is None else map(self.data.__getitem__, candidates)
+        return filter(lambda x: x is not None, map(search, data))
+
+    def __candidate_sets(self, match_dict: dict, path: tuple) -> Iterator[set]:
+        for key, node in match_dict.items():
+            if isinstance(node, dict):
+                yield from self.__candidate_sets(node, (*path, key))
+            elif not isinstance(node, MatchNode) or not self.__is_narrowing(node.operator):
+                continue
+            elif node.kind is None:
+                yield from self.__operator_candidates(node, (*path, key))
+            elif type(node.operator) is hop.And:
+                for sub_query in node.query:
+                    yield from self.__candidate_sets(sub_query, path)
+            else:
+                yield from self.__operator_candidates(node, path)
+
+    def __operator_candidates(self, node: MatchNode, path: tuple) -> Iterator[set]:
+        index, op = self.indexes.get(path), node.operator
+        if index is None:
+            return
+        op_type = type(op)
+        candidates = None
+        if op_type is lop.Equal:
+            candidates = index.equal([op.comp])
+        elif op_type is lop.In and isinstance(op.comp, (list, tuple, set, frozenset)):
+            candidates = index.equal(list(op.comp))
+        elif op_type in _RANGES:
+            candidates = index.range(op_type, op.comp)
+        if candidates is not None:
+            yield candidates
+
+    @staticmethod
+    def __is_narrowing(op) -> bool:
+        """Operators configured to return True on exceptions or ignored types may match values the index skips"""
+        return not op.default_return and not any((op.expected_exc or {}).values())
@@ -1,14 +1,17 @@
+from functools import lru_cache
 from inspect import isclass, getmembers, isabstract
 from types import ModuleType as _ModuleType
 
-from .bases import ArrayOperator, ArraySelector, HighLevelOperator, LowLevelOperator, Operator
+from .bases import BATCH_CACHE, ArrayOperator, ArraySelector, HighLevelOperator, LowLevelOperator, Operator
 
 ALL_OPERATOR_TYPES = [LowLevelOperator, HighLevelOperator, ArrayOperator, ArraySelector, Operator]
 
 
-def get_operators(module: _ModuleType) -> list[..., type]:
+@lru_cache(maxsize=None)
+def get_operators(module: _ModuleType) -> tuple[type, ...]:
+    """Concrete Operator subclasses of a module, looked up once per module and process"""
     classes = getmembers(module, isclass)
-    return list(
+    return tuple(
         map(
             lambda x: x[1],
             filter(lambda x: isinstance(x[1], type) and issubclass(x[1], Operator) and not isabstract(x[1]), classes),
@@ -1,7 +1,9 @@
 import typing
 from abc import ABC, abstractmethod
+from collections import namedtuple
 from dataclasses import dataclass
-from functools import partial
+from functools import lru_cache
+from operator import attrgetter
 from pprint import pprint
 from types import MethodType
 from typing import Any, Type, Union
@@ -15,15 +17,91 @@ class MatchNode:
 
     operator: Operator instance
     query: Set if your operator should be used alongside a subquery in DictSearch.
+    kind: Set by DictSearch when parsing, used to dispatch the node without looking up the operator name.
     """
     operator: "Operator"
     query: dict = None
+    kind: str = None
+
+
+BATCH_CACHE = "batch"
+_IMPLEMENTATION_ATTRS = {"implementation", "original_implementation"}
+_CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class _BatchMemo:
+    """Unbounded memo of a single argument function, typed like lru_cache(typed=True): only the outer type is
+    part of the key, operators never memoize tuples and frozensets"""
+
+    def __init__(self, func):
+        self.func = func
+        self.results = {}
+        self.hits = self.misses = 0
+
+    def __call__(self, data):
+        key = (type(data), data)
+        if key in self.results:
+            self.hits += 1
+            return self.results[key]
+        self.misses += 1
+        result = self.results[key] = self.func(data)
+        return result
+
+    def cache_info(self):
+        return _CacheInfo(self.hits, self.misses, None, len(self.results))
+
+    def cache_clear(self):
+        self.results.clear()
+        self.hits = self.misses = 0
+
+
+@lru_cache(maxsize=None)
+def _fused_factory(allowed: bool, ignored: bool, expected: bool, memo: bool) -> typing.Callable:
+    """Generate once per combination of checks a factory of a single function running all of them around 'func'
+
+    Equivalent to nesting the allowed_types, ignored_types, expected_exc and cache wrappers (outermost first)
+    without paying a Python frame per wrapper on every call.
+    """
+    body = []
+    if allowed:
+        body += ["if not isinstance(data, allowed):", "    return op.default_return"]
+    if ignored:
+        body += ["if isinstance(data, ignored):", "    return op.default_return"]
+    call = ["return func(data, *args, **kwargs)"]
+    if memo:
+        call = [
+            "if args or kwargs or isinstance(data, (tuple, frozenset)):",  # typed keys miss the element types
+            "    return func(data, *args, **kwargs)",
+            "try:",
+            "    hash(data)",
+            "except TypeError:",
+            "    return func(data)",
+            "if op._Operator__memo_is_stale():",
+            "    return op.implementation(data)",
+            "return memo(data)",
+        ]
+    if expected:
+        call = ["try:", *(f"    {line}" for line in call), "except expected as e:", "    return op._expected_result(e)"]
+    source = "\n".join(
+        [
+            "def factory(op, func, memo, allowed, ignored, expected):",
+            "    def fused(data, *args, **kwargs):",
+            *(f"        {line}" for line in body + call),
+            "    return fused",
+        ]
+    )
+    namespace = {}
+    exec(source, namespace)
+    return namespace["factory"]
 
 
 class Operator(ABC):
     _match_node = MatchNode
     name: str = None
     default_return: Any = None
+    cost: float = 1
+    cacheable: bool = True  # False if results depend on the identity of 'data', 'cache' is then ignored
+    _cache_neutral_attrs: tuple = ()  # public attributes updated while evaluating that keep the memo valid
 
     @abstractmethod
     def implementation(self, *args) -> Any:
@@ -60,6 +138,19 @@ class Operator(ABC):
     def __call__(self, *args, **kwargs) -> Any:
         return self.implementation(*args, **kwargs)
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for attr in ["implementation", "original_implementation", "_Operator__memo", "_Operator__config_getter"]:
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state: dict):
+        expected_exc, allowed_types, ignored_types, cache = [
+            state.pop(attr) for attr in ["_expected_exc", "_allowed_types", "_ignored_types", "_cache"]
+        ]
+        self.__dict__.update(state)
+        Operator.__init__(self, expected_exc, allowed_types, ignored_types, cache=cache)
+
     def __new__(cls, *args, **kwargs):
         instance = super().__new__(cls)
         for attr in ["name", "default_return"]:
@@ -71,6 +162,8 @@ class Operator(ABC):
             Operator.expected_exc.fget.__name__,
             Operator.allowed_types.fget.__name__,
             Operator.ignored_types.fget.__name__,
+            Operator.cache.fget.__name__,
+            Operator.cache_size.fget.__name__,
             Operator.__call__.__name__,
             Operator.__wrap_implementation.__name__,
         ]
@@ -88,16 +181,18 @@ class Operator(ABC):
         expected_exc: Union[Type[Exception], tuple[..., Type[Exception]], dict] = None,
         allowed_types: Union[Type, tuple[..., Type]] = None,
         ignored_types: Union[Type, tuple[..., Type]] = None,
+        cache_size: int = None,
+        cache: Union[int, str, typing.Callable] = None,
     ):
         self.original_implementation = self.implementation
-        self.__implementation_wrappers = {
-            Operator.expected_exc.fget.__name__: None,
-            Operator.ignored_types.fget.__name__: None,
-            Operator.allowed_types.fget.__name__: None,
-        }
+        self.__config_getter = self.__memo_config = None
+        self._expected_exc = self._ignored_types = self._allowed_types = self._cache = None
         self.expected_exc = expected_exc
         self.ignored_types = ignored_types
         self.allowed_types = allowed_types
+        self.cache_size = cache_size
+        if cache is not None:
+            self.cache = cache
 
     @property
     def expected_exc(self):
@@ -118,24 +213,19 @@ class Operator(ABC):
             self._expected_exc = expected_exc
         else:
             raise exceptions.OperatorExpectedExcArgError(func_name, type(self.default_return))
-        self.__implementation_wrappers[func_name] = None if not expected_exc else self.__expected_exc
         self.__wrap_implementation()
 
-    def __expected_exc(self, func, *args, **kwargs):
-        try:
-            return func(*args, **kwargs)
-        except tuple(self.expected_exc.keys()) as e:
-            exc_type = type(e)
-            if exc_type in self.expected_exc:
-                return self.expected_exc[exc_type]
-            parent_exc_type = list(filter(lambda x: x in self.expected_exc, e.__class__.mro()))[0]  # first in mro order
-            return self.expected_exc[parent_exc_type]
-
-    def __set_type_checkers(self, val, func_name, func):
+    def _expected_result(self, e: Exception) -> Any:
+        exc_type = type(e)
+        if exc_type in self.expected_exc:
+            return self.expected_exc[exc_type]
+        parent_exc_type = list(filter(lambda x: x in self.expected_exc, e.__class__.mro()))[0]  # first in mro order
+        return self.expected_exc[parent_exc_type]
+
+    def __set_type_checkers(self, val, func_name):
         if val and not(isinstance(val, type) or (isinstance(val, tuple) and all(isinstance(v, type) for v in val))):
             raise exceptions.OperatorTypeCheckerError(func_name)
         setattr(self, f"_{func_name}", val)
-        self.__implementation_wrappers[func_name] = func if val else None
         self.__wrap_implementation()
 
     @property
@@ -144,12 +234,7 @@ class Operator(ABC):
 
     @ignored_types.setter
     def ignored_types(self, value):
-        self.__set_type_checkers(value, Operator.ignored_types.fget.__name__, self.__ignored_types)
-
-    def __ignored_types(self, func, data, *args):
-        if isinstance(data, self.ignored_types):
-            return self.default_return
-        return func(data, *args)
+        self.__set_type_checkers(value, Operator.ignored_types.fget.__name__)
 
     @property
     def allowed_types(self):
@@ -157,17 +242,91 @@ class Operator(ABC):
 
     @allowed_types.setter
     def allowed_types(self, value):
-        self.__set_type_checkers(value, Operator.allowed_types.fget.__name__, self.__allowed_types)
+        self.__set_type_checkers(value, Operator.allowed_types.fget.__name__)
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @cache.setter
+    def cache(self, value):
+        """None, a positive int (LRU size), BATCH_CACHE (memo kept until 'clear_cache') or a callable decorating
+        the implementation, e.g. functools.cache. The memo is emptied when a public attribute, e.g. 'comp', is
+        reassigned. Tuples and frozensets are not memoized, equal ones can hold elements of other types, e.g. (1,) and
+        (True,). Operators that are not 'cacheable' are never memoized."""
+        is_size = isinstance(value, int) and not isinstance(value, bool)
+        if not (value is None or value == BATCH_CACHE or callable(value) or (is_size and value > 0)):
+            raise exceptions.OperatorCacheError(Operator.cache.fget.__name__, BATCH_CACHE)
+        self._cache = value
+        self.__wrap_implementation()
+
+    @property
+    def cache_size(self):
+        """LRU shorthand of 'cache'"""
+        return self.cache if isinstance(self.cache, int) else None
 
-    def __allowed_types(self, func, data, *args):
-        if not isinstance(data, self.allowed_types):
-            return self.default_return
-        return func(data, *args)
+    @cache_size.setter
+    def cache_size(self, value):
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise exceptions.OperatorCacheSizeError(Operator.cache_size.fget.__name__)
+        self.cache = value
+
+    @property
+    def cache_hits(self) -> int:
+        return self.__memo.cache_info().hits if hasattr(self.__memo, "cache_info") else 0
+
+    @property
+    def cache_misses(self) -> int:
+        return self.__memo.cache_info().misses if hasattr(self.__memo, "cache_info") else 0
+
+    def clear_cache(self):
+        """Empty the memoized results, DictSearch calls it on BATCH_CACHE operators before every batch"""
+        if hasattr(self.__memo, "cache_clear"):
+            self.__memo.cache_clear()
+
+    def __memo_is_stale(self) -> bool:
+        """Empty the memo if the public attributes changed since it was filled, True if the memo was rebuilt"""
+        if self.__config_getter is None:  # first memoized call, the subclass attributes are all set by now
+            subclasses = type(self).__mro__[: type(self).__mro__.index(Operator)]
+            properties = [k for cls in subclasses for k, v in vars(cls).items() if isinstance(v, property)]
+            names = [k for k in dict.fromkeys([*vars(self), *properties]) if k[0] != "_"]
+            names = [k for k in names if k not in _IMPLEMENTATION_ATTRS and k not in self._cache_neutral_attrs]
+            self.__config_getter = attrgetter(*names) if names else lambda op: None
+            self.__memo_config = self.__config_getter(self)
+            return False
+        config = self.__config_getter(self)
+        try:
+            if config is self.__memo_config or config == self.__memo_config:
+                return False
+        except (TypeError, ValueError):  # no truth value for ==, e.g. ndarray attributes, the memo is emptied
+            pass
+        self.__memo_config = config
+        if hasattr(self.__memo, "cache_clear"):
+            self.__memo.cache_clear()
+            return False
+        self.__wrap_implementation()
+        return True
+
+    def __build_memo(self):
+        if self.cache is None or not self.cacheable:
+            return None
+        if self.cache == BATCH_CACHE:
+            return _BatchMemo(self.original_implementation)
+        if callable(self.cache):
+            return self.cache(self.original_implementation)
+        return lru_cache(self.cache, typed=True)(self.original_implementation)
 
     def __wrap_implementation(self):
-        self.implementation = self.original_implementation
-        for func in filter(lambda x: x is not None, self.__implementation_wrappers.values()):
-            self.implementation = partial(func, self.implementation)
+        self.__memo = self.__build_memo()
+        checks = (self.allowed_types, self.ignored_types, self.expected_exc, self.__memo)
+        if not any(checks):
+            self.implementation = self.original_implementation
+            return
+        factory = _fused_factory(*(bool(check) for check in checks))
+        expected = tuple(self.expected_exc) if self.expected_exc else None
+        self.implementation = factory(
+            self, self.original_implementation, self.__memo, self.allowed_types, self.ignored_types, expected
+        )
 
 
 class LowLevelOperator(Operator, ABC):
@@ -46,6 +46,16 @@ class OperatorTypeCheckerError(TypeError):
         super().__init__(f"'{func_name}' should be type or tuple[..., type]")
 
 
+class OperatorCacheSizeError(TypeError):
+    def __init__(self, func_name):
+        super().__init__(f"'{func_name}' should be None or a positive int")
+
+
+class OperatorCacheError(TypeError):
+    def __init__(self, func_name, batch):
+        super().__init__(f"'{func_name}' should be None, a positive int, '{batch}' or a callable")
+
+
 class OperatorDefaultReturnError(TypeError):
     def __init__(self, prop, attr_name, attr):
         super().__init__(f"Provide a value for {prop} " f"of the same type as {attr_name} :\n" f"{type(attr)}")
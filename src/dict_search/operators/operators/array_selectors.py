@@ -1,23 +1,27 @@
 from .. import exceptions
-from ..bases import ArraySelector
+from ..bases import ArraySelector, MatchNode
 from ..constants import SLICING_PATTERN
 
 
 class Where(ArraySelector):
     name = "where"
+    cost = 5
 
     def __init__(self, search_val, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.search_val = search_val
 
-    def implementation(self, data, search_instance):
-        prev_match_query = search_instance.match_query
-        try:
-            search_instance.match_query = self.search_val
-            matched_data = list(search_instance.filter(data))
-        finally:
-            search_instance.match_query = prev_match_query
-        return matched_data
+    def implementation(self, data, match_func):
+        if self.search_val is None:
+            return [d_point for d_point in data if isinstance(d_point, dict)]
+        return [d_point for d_point in data if isinstance(d_point, dict) and match_func(d_point, self.search_val)]
+
+    @classmethod
+    def init_match_node(cls, match_query, parse_func) -> MatchNode:
+        node = super().init_match_node(match_query, parse_func)
+        if isinstance(node.operator.search_val, dict):
+            node.operator.search_val = parse_func(node.operator.search_val)
+        return node
 
 
 class Index(ArraySelector):
@@ -56,12 +60,13 @@ class Slice(ArraySelector):
 
     def __init__(self, slice_str, **kwargs):
         super().__init__(**kwargs)
-        self.slice_str = self.precondition(slice_str)
+        self.slice_str = slice_str
+        self.slice = self.precondition(slice_str)
 
     def implementation(self, data):
-        return eval(f"data[{self.slice_str}]", {"data": data})
+        return data[self.slice]
 
-    def precondition(self, slice_str):
+    def precondition(self, slice_str) -> slice:
         if not isinstance(slice_str, str) or not SLICING_PATTERN.match(slice_str):
             raise exceptions.SliceSelectionOperatorError(slice_str)
-        return slice_str
+        return slice(*(int(x) if x else None for x in slice_str.split(":")))
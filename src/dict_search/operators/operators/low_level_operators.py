@@ -1,6 +1,8 @@
 import re
+from abc import ABC
+from threading import Lock
 from types import FunctionType
-from typing import Any, Hashable
+from typing import Any, Hashable, Union
 
 
 from ... import utils
@@ -9,6 +11,25 @@ from ..constants import CONTAINER_TYPE
 from ..bases import LowLevelOperator
 
 
+def _membership_sets(search_val) -> tuple:
+    """Split a list, tuple or set of search values into a frozenset of the hashable ones and a tuple of the rest
+
+    Equal hashable values share their hash (1, 1.0 and True), so a frozenset lookup answers like a list scan.
+    Any other search value, e.g. a str tested for substrings, is kept whole as the second member.
+    """
+    if not isinstance(search_val, (list, tuple, set, frozenset)):
+        return (), search_val
+    hashable, unhashable = [], []
+    for value in search_val:
+        try:
+            hash(value)
+        except TypeError:
+            unhashable.append(value)
+        else:
+            hashable.append(value)
+    return frozenset(hashable), tuple(unhashable)
+
+
 class Equal(LowLevelOperator):
     name = "eq"
 
@@ -77,6 +98,7 @@ class LessThenEq(LowLevelOperator):
 
 class Is(LowLevelOperator):
     name = "is"
+    cacheable = False
 
     def __init__(self, search_val, **kwargs):
         super().__init__(**kwargs)
@@ -86,26 +108,41 @@ class Is(LowLevelOperator):
         return data is self.comp
 
 
-class In(LowLevelOperator):
-    name = "in"
+class _MembershipOperator(LowLevelOperator, ABC):
+    """Base of '$in' and '$nin', the membership sets are rebuilt whenever 'comp' is assigned"""
 
     def __init__(self, search_val, **kwargs):
         super().__init__(**kwargs)
         self.comp = search_val
 
+    @property
+    def comp(self):
+        return self._comp
+
+    @comp.setter
+    def comp(self, search_val):
+        self._comp = search_val
+        self._hashable, self._unhashable = _membership_sets(search_val)
+
+
+class In(_MembershipOperator):
+    name = "in"
+
     def implementation(self, data) -> bool:
-        return data in self.comp
+        try:
+            return data in self._hashable or data in self._unhashable
+        except TypeError:  # unhashable data, e.g. a list, is compared against every search value
+            return data in self._comp
 
 
-class NotIn(LowLevelOperator):
+class NotIn(_MembershipOperator):
     name = "nin"
 
-    def __init__(self, search_val, **kwargs):
-        super().__init__(**kwargs)
-        self.comp = search_val
-
     def implementation(self, data) -> bool:
-        return data not in self.comp
+        try:
+            return not (data in self._hashable or data in self._unhashable)
+        except TypeError:  # unhashable data, e.g. a list, is compared against every search value
+            return data not in self._comp
 
 
 class Contains(LowLevelOperator):
@@ -132,6 +169,7 @@ class NotContains(LowLevelOperator):
 
 class Regex(LowLevelOperator):
     name = "regex"
+    cost = 10
 
     def __init__(self, pattern, **kwargs):
         super().__init__(**kwargs)
@@ -151,6 +189,7 @@ class Regex(LowLevelOperator):
 
 class Function(LowLevelOperator):
     name = "func"
+    cost = 10
 
     def __init__(self, function, **kwargs):
         super().__init__(**kwargs)
@@ -172,10 +211,15 @@ class IsInstance(LowLevelOperator):
         return isinstance(data, self.data_type)
 
 
+def _compare_equal(x, y) -> bool:
+    return y == x
+
+
 class Compare(LowLevelOperator):
     name = "comp"
+    cost = 3
 
-    def __init__(self, keys, *args, func=lambda x, y: y == x, **kwargs):
+    def __init__(self, keys, *args, func=_compare_equal, **kwargs):
         super().__init__(*args, **kwargs)
         self.keys, self.func = self.precondition(keys, func)
 
@@ -206,15 +250,54 @@ class Compare(LowLevelOperator):
 
 
 class Find(LowLevelOperator):
-    name = "find"
+    """With 'learn_paths' and a single candidate, the last 'learned_paths_size' paths where 'keys' were found are
+    followed before searching the whole data. They lead to a genuine match, not necessarily the first in document
+    order if documents differ in shape. 'path_hits' and 'path_misses' count followed paths and full searches.
+    The learned paths and counters are updated under a lock of the operator and the list is replaced rather than
+    modified, so threads or searches sharing the operator (e.g. through the plan cache) also share what it learned.
+    """
 
-    def __init__(self, keys, *args, max_depth: int = 32, candidates: int = 1, index: int = 1, iterables=None, **kwargs):
+    name = "find"
+    cost = 20
+    _cache_neutral_attrs = ("learned_paths", "path_hits", "path_misses")
+
+    def __init__(
+        self,
+        keys,
+        *args,
+        max_depth: int = 32,
+        candidates: int = 1,
+        index: int = 1,
+        iterables=None,
+        learn_paths: bool = False,
+        learned_paths_size: int = 8,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.keys = self.precondition(keys)
         self.max_depth = max_depth
         self.candidates = candidates
         self.index = index
         self.iterables = iterables
+        self.learn_paths = learn_paths
+        self.learned_paths_size = learned_paths_size
+        self.learned_paths = []
+        self.path_hits = self.path_misses = 0
+        self.__lock = Lock()
+
+    def __getstate__(self) -> dict:
+        state = super().__getstate__()
+        state.pop("_Find__lock")
+        return state
+
+    def __setstate__(self, state: dict):
+        super().__setstate__(state)
+        self.__lock = Lock()
+
+    @property
+    def path_hit_rate(self) -> float:
+        searches = self.path_hits + self.path_misses
+        return self.path_hits / searches if searches else 0.0
 
     def precondition(self, keys: Any) -> Any:
         if not isinstance(keys, (Hashable, list)):
@@ -224,23 +307,46 @@ class Find(LowLevelOperator):
         return keys
 
     @classmethod
-    def init_match_node(cls, match_query, *args):
+    def init_match_node(cls, match_query, parse_func):
         if not isinstance(match_query, list) or len(match_query) != 2:
             raise Exception
         keys, query = match_query[0], match_query[1]
+        query = parse_func(query) if isinstance(query, dict) else query
         return cls._match_node(cls(keys), query)
 
     def implementation(self, data) -> Any:
-        result = utils.find_value(
-            data,
-            self.keys,
-            max_depth=self.max_depth,
-            candidates=self.candidates,
-            index=self.index,
-            iterables=self.iterables,
-        )
+        learn = self.learn_paths and self.candidates == 1
+        result = self.__follow_learned_paths(data) if learn else None
+        if result is None:
+            result = utils.find_value(
+                data,
+                self.keys,
+                max_depth=self.max_depth,
+                candidates=self.candidates,
+                index=self.index,
+                iterables=self.iterables,
+            )
+            if learn:
+                self.__learn(result)
         if isinstance(result, list):
             return [r.result for r in result]
         elif result.found:
             return result.result
         return result
+
+    def __follow_learned_paths(self, data) -> Union[utils.FindResult, list, None]:
+        for path in self.learned_paths:
+            result = utils.find_at_path(data, path, self.iterables)
+            if result.found:
+                with self.__lock:
+                    self.path_hits += 1
+                return [result] if self.index is None else result
+        with self.__lock:
+            self.path_misses += 1
+
+    def __learn(self, result: Union[utils.FindResult, list]):
+        result = result[0] if isinstance(result, list) and result else result
+        if isinstance(result, utils.FindResult) and result.found:
+            path = tuple(result.prev_keys)
+            with self.__lock:
+                self.learned_paths = [path, *self.learned_paths][: self.learned_paths_size]
@@ -0,0 +1,50 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator
+
+_worker_search = None
+
+
+def _init_worker(search):
+    """Receive the pickled search once per worker process"""
+    global _worker_search
+    _worker_search = search
+
+
+def _filter_chunk(chunk: list) -> list:
+    return [value for value in map(_worker_search, chunk) if value is not None]
+
+
+def iter_chunks(data: Iterable, chunksize: int) -> Iterator[list]:
+    iterator = iter(data)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parallel_filter(
+    search, data: Iterable, workers: int = None, chunksize: int = 1000, ordered: bool = True
+) -> Iterator:
+    """Evaluate chunks of 'data' in a process pool and yield the valid members as the chunks complete
+
+    Only 'workers * 2' chunks are in flight at any time, so 'data' can be a lazy iterable of any size.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_chunks(data, chunksize)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(search,)) as executor:
+        pending = deque(executor.submit(_filter_chunk, chunk) for chunk in islice(chunks, workers * 2))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+                pending = deque(future for future in pending if future not in done)
+            for future in done:
+                yield from future.result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append(executor.submit(_filter_chunk, chunk))
@@ -0,0 +1,88 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from typing import Any, Hashable, Union
+
+from . import exceptions
+
+_CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+_ORDERED = (dict, list, tuple)
+_UNORDERED = (set, frozenset)
+
+
+def canonical_form(value) -> Hashable:
+    """Hashable form of a query, typed so values equal across types (1, 1.0 and True) get different forms
+
+    Dicts keep the order of their keys, it is the order their tests run in. Raises TypeError when a value
+    is neither a container nor hashable, such a query can not be cached.
+    """
+    if isinstance(value, dict):
+        return type(value), tuple((canonical_form(k), canonical_form(v)) for k, v in value.items())
+    if isinstance(value, _ORDERED):
+        return type(value), tuple(canonical_form(v) for v in value)
+    if isinstance(value, _UNORDERED):
+        return type(value), frozenset(canonical_form(v) for v in value)
+    hash(value)
+    return type(value), value
+
+
+class PlanCache:
+    """Process wide LRU cache of the plans built by DictSearch for its match queries
+
+    A DictSearch assigned a match query already in the cache, with the same operators, 'ops_init_config',
+    'compile_match' and 'reorder_match', reuses its plan instead of parsing and compiling the query again.
+    The operator instances of a cached plan are shared by every DictSearch evaluating it, along with their caches,
+    learned paths and counters, until 'get_operator', 'used_operators' or 'plan_match' gives a search a private
+    copy. Disabled while 'maxsize' is 0.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.__plans = OrderedDict()
+        self.__lock = Lock()
+        self.hits = self.misses = 0
+        self.maxsize = maxsize
+
+    def __len__(self):
+        return len(self.__plans)
+
+    @property
+    def maxsize(self) -> int:
+        return self.__maxsize
+
+    @maxsize.setter
+    def maxsize(self, value: int):
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise exceptions.PlanCacheSizeError
+        with self.__lock:
+            self.__maxsize = value
+            while len(self.__plans) > value:
+                self.__plans.popitem(last=False)
+
+    def get(self, key: Hashable) -> Union[Any, None]:
+        with self.__lock:
+            plan = self.__plans.get(key)
+            if plan is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__plans.move_to_end(key)
+            return plan
+
+    def put(self, key: Hashable, plan):
+        with self.__lock:
+            if not self.__maxsize:
+                return
+            self.__plans[key] = plan
+            self.__plans.move_to_end(key)
+            if len(self.__plans) > self.__maxsize:
+                self.__plans.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__plans.clear()
+            self.hits = self.misses = 0
+
+    def cache_info(self) -> _CacheInfo:
+        return _CacheInfo(self.hits, self.misses, self.__maxsize, len(self.__plans))
+
+
+PLAN_CACHE = PlanCache()
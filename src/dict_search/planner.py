@@ -0,0 +1,111 @@
+from typing import Iterator
+
+from .operators.bases import ArrayOperator, HighLevelOperator, MatchNode
+from .operators.operators import high_level_operators as hop, low_level_operators as lop
+
+DEFAULT_PASS_RATE = 0.5
+ARRAY_LENGTH = 4  # elements an array operator is assumed to evaluate its sub query on
+_PASS_RATES = {
+    lop.Equal: 0.1,
+    lop.Is: 0.1,
+    lop.In: 0.2,
+    lop.NotEqual: 0.9,
+    lop.NotIn: 0.8,
+    lop.IsInstance: 0.8,
+}
+
+
+def _and_rank(cost: float, pass_rate: float) -> float:
+    return cost / (1 - pass_rate) if pass_rate < 1 else float("inf")
+
+
+def _or_rank(cost: float, pass_rate: float) -> float:
+    return cost / pass_rate if pass_rate > 0 else float("inf")
+
+
+def _and_estimate(estimates: list) -> tuple:
+    cost, pass_rate = 0, 1
+    for sub_cost, sub_pass_rate in estimates:
+        cost += pass_rate * sub_cost
+        pass_rate *= sub_pass_rate
+    return cost, pass_rate
+
+
+def _or_estimate(estimates: list) -> tuple:
+    cost, fail_rate = 0, 1
+    for sub_cost, sub_pass_rate in estimates:
+        cost += fail_rate * sub_cost
+        fail_rate *= 1 - sub_pass_rate
+    return cost, 1 - fail_rate
+
+
+def _plan_list(queries: list, pass_rates: dict, rank=None, estimate=_and_estimate) -> tuple:
+    estimates = {id(query): _with_rate(query, plan_match(query, pass_rates), pass_rates) for query in queries}
+    if rank:
+        queries.sort(key=lambda query: rank(*estimates[id(query)]))
+    return estimate([estimates[id(query)] for query in queries])
+
+
+def _with_rate(value, estimate: tuple, pass_rates: dict) -> tuple:
+    return estimate[0], pass_rates.get(id(value), estimate[1])
+
+
+def _estimate_node(node: MatchNode, pass_rates: dict) -> tuple:
+    op, query = node.operator, node.query
+    if isinstance(query, list) and isinstance(op, HighLevelOperator):
+        if type(op) in (hop.And, hop.Not):
+            cost, pass_rate = _plan_list(query, pass_rates, _and_rank)
+        elif type(op) in (hop.Or, hop.NotAny):
+            cost, pass_rate = _plan_list(query, pass_rates, _or_rank, _or_estimate)
+        else:
+            cost, pass_rate = _plan_list(query, pass_rates)
+        if type(op) in (hop.Not, hop.NotAny):
+            pass_rate = 1 - pass_rate
+        elif type(op) not in (hop.And, hop.Or):
+            pass_rate = DEFAULT_PASS_RATE
+        return op.cost + cost, pass_rate
+    if isinstance(query, dict):
+        sub_cost = plan_match(query, pass_rates)[0] * (ARRAY_LENGTH if isinstance(op, ArrayOperator) else 1)
+        return op.cost + sub_cost, DEFAULT_PASS_RATE
+    return op.cost, _PASS_RATES.get(type(op), DEFAULT_PASS_RATE)
+
+
+def plan_match(match_dict, pass_rates: dict = None) -> tuple:
+    """Reorder in place the conjunctions and disjunctions of a parsed match query so cheap and selective tests run first
+
+    The keys of every dict and the sub queries of '$and' and '$not' are sorted by cost / (1 - pass rate), the sub
+    queries of '$or' and '$not_any' by cost / pass rate. Costs come from the 'cost' attribute of the operators and
+    pass rates from 'pass_rates' (ids of the parsed values mapped to their observed rate) or a per operator guess.
+    Returns the estimated (cost, pass rate) of the whole query.
+    """
+    pass_rates = pass_rates or {}
+    if not isinstance(match_dict, dict) or not match_dict:
+        return 1, DEFAULT_PASS_RATE
+    estimates = {}
+    for key, value in match_dict.items():
+        estimate = plan_match(value, pass_rates) if isinstance(value, dict) else _estimate_node(value, pass_rates)
+        estimates[key] = _with_rate(value, estimate, pass_rates)
+    items = sorted(match_dict.items(), key=lambda item: _and_rank(*estimates[item[0]]))
+    match_dict.clear()
+    match_dict.update(items)
+    return _and_estimate([estimates[key] for key in match_dict])
+
+
+def iter_predicates(match_dict, prev_keys: tuple = ()) -> Iterator[tuple]:
+    """Yield the id of every value the planner ranks along a match query that evaluates only that value"""
+    if not isinstance(match_dict, dict):
+        return
+    for key, value in match_dict.items():
+        yield id(value), _nest(prev_keys, {key: value})
+        if isinstance(value, dict):
+            yield from iter_predicates(value, (*prev_keys, key))
+        elif isinstance(value, MatchNode) and isinstance(value.operator, HighLevelOperator):
+            for query in value.query if isinstance(value.query, list) else []:
+                yield id(query), _nest(prev_keys, query)
+                yield from iter_predicates(query, prev_keys)
+
+
+def _nest(prev_keys: tuple, query: dict) -> dict:
+    for key in reversed(prev_keys):
+        query = {key: query}
+    return query
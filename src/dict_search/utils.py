@@ -1,6 +1,6 @@
 from collections import namedtuple
 
-from typing import Iterable, Type
+from typing import Iterable, Sequence, Type
 
 Result = namedtuple("Result", "empty result", defaults=(True, None))
 
@@ -49,11 +49,22 @@ class IndexMarker(int):
 
 
 class FindResult:
-    def __init__(self, found=False, result=None, prev_keys=None):
-        prev_keys = prev_keys if prev_keys else []
+    def __init__(self, found=False, result=None, prev_keys=None, path=None):
         self.found = found
         self.result = result
-        self.prev_keys = prev_keys
+        self._path = path
+        self._prev_keys = prev_keys if prev_keys or path is None else None
+
+    @property
+    def prev_keys(self) -> list:
+        """Keys and IndexMarker positions leading to the result, built from the search path on first access"""
+        if self._prev_keys is None:
+            self._prev_keys = _path_keys(self._path)
+        return self._prev_keys
+
+    @prev_keys.setter
+    def prev_keys(self, value):
+        self._prev_keys = value if value else []
 
     def __repr__(self):
         try:
@@ -78,7 +89,7 @@ class FindResult:
 def find_value(dikt, keys, max_depth=32, candidates=1, index=0, iterables=None):
     keys = [keys] if not isinstance(keys, list) else keys
     results = []
-    for result in __recursive_find_value(dikt, keys, max_depth=max_depth, iterables=iterables):
+    for result in __iter_find_value(dikt, tuple(keys), max_depth=max_depth, iterables=iterables):
         results.append(result)
         if len(results) == candidates:
             return results if index is None else __try_index(results, index)
@@ -89,44 +100,60 @@ def find_value(dikt, keys, max_depth=32, candidates=1, index=0, iterables=None):
     return FindResult()
 
 
-def __recursive_find_value(
-    obj: dict,
-    keys: list,
-    found_keys: list = None,
-    initial_keys: list = None,
-    prev_keys: list = None,
-    depth: int = 0,
-    max_depth: int = 32,
-    iterables: Type[Iterable] = None,
-):
-    found_keys = found_keys if found_keys else []
-    initial_keys = keys if not initial_keys else initial_keys
-    prev_keys = prev_keys if prev_keys else []
-    if found_keys == initial_keys:
-        yield FindResult(True, obj, prev_keys.copy())
-    if isinstance(obj, dict) and keys and depth <= max_depth:
-        for key, value in obj.items():
-            prev_keys.append(key)
-            if key == keys[0]:
-                found_keys.append(key)
-                depth += 1
-                yield from __recursive_find_value(
-                    value, keys[1:], found_keys, initial_keys, prev_keys, depth, max_depth, iterables
-                )
-                found_keys.pop()
-                depth -= 1
-            else:
-                depth += 1
-                yield from __recursive_find_value(value, keys, found_keys, initial_keys, prev_keys, depth, max_depth, iterables)
-                depth -= 1
-            prev_keys.pop()
-    elif iterables and isinstance(obj, iterables):
-        for index, sub_obj in enumerate(obj):
-            prev_keys.append(IndexMarker(index))
-            depth += 1
-            yield from __recursive_find_value(sub_obj, initial_keys, [], initial_keys, prev_keys, depth, max_depth, iterables)
-            depth -= 1
-            prev_keys.pop()
+_END = object()
+
+
+def find_at_path(obj, path, iterables: Type[Iterable] = None) -> FindResult:
+    """Follow a concrete path as found by find_value (keys and IndexMarker positions of sequences in 'iterables')"""
+    for key in path:
+        if type(key) is IndexMarker:
+            if not (iterables and isinstance(obj, iterables) and isinstance(obj, Sequence)) or key >= len(obj):
+                return FindResult()
+        elif not isinstance(obj, dict) or key not in obj:
+            return FindResult()
+        obj = obj[key]
+    return FindResult(True, obj, list(path))
+
+
+def __iter_find_value(obj, keys: tuple, max_depth: int = 32, iterables: Type[Iterable] = None):
+    """Depth first search of the values reached through a path holding 'keys' in order, not necessarily contiguous
+
+    Matching is a cursor over 'keys': a key equal to the next expected one advances it, any other key keeps it,
+    and entering an element of 'iterables' resets it. Frames of an explicit stack replace recursion and the path
+    to every node is a linked (parent, key, is_index) tuple only turned into a list if the result asks for it.
+    """
+    n_keys = len(keys)
+    stack = []
+    node = (obj, 0, 0, None)
+    while True:
+        if node is not None:
+            obj, pos, depth, path = node
+            if pos == n_keys:
+                yield FindResult(True, obj, path=path)
+            if isinstance(obj, dict) and pos < n_keys and depth <= max_depth:
+                stack.append((iter(obj.items()), pos, depth + 1, path, keys[pos]))
+            elif iterables and isinstance(obj, iterables):
+                stack.append((enumerate(obj), -1, depth + 1, path, None))
+        if not stack:
+            return
+        items, pos, depth, path, next_key = stack[-1]
+        item = next(items, _END)
+        if item is _END:
+            stack.pop()
+            node = None
+        elif pos < 0:
+            node = (item[1], 0, depth, (path, item[0], True))
+        else:
+            node = (item[1], pos + 1 if item[0] == next_key else pos, depth, (path, item[0], False))
+
+
+def _path_keys(path) -> list:
+    keys = []
+    while path is not None:
+        path, key, is_index = path
+        keys.append(IndexMarker(key) if is_index else key)
+    keys.reverse()
+    return keys
 
 
 def __try_index(lst: list, index: int):
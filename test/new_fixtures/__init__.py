@@ -7,6 +7,13 @@ import uuid
 
 
 def build_fixtures(n_docs):
+    for index, document in enumerate(generate_fixtures(n_docs)):
+        print(document)
+        with open(f"{index}.json", "w") as file:
+            json.dump(document, file, indent=4, default=str)
+
+
+def generate_fixtures(n_docs):
     countries = ["Spain", "Italy", "Sudan", "USA", "Zimbawe", "Indonesia", "Peru", "Haiti", "Russia", "Albania"]
     products_list = ["BMW", "Mercedes", "Audi", "Porsche", "Mustang", "Kawasaki", "Bentley", "Maybach", "Aston Martin"]
     status = ["Partial", "ToProcess", "Finished", "Expired"]
@@ -107,9 +114,7 @@ def build_fixtures(n_docs):
                 ]
             )
         )
-        print(document)
-        with open(f"{_}.json", "w") as file:
-            json.dump(document, file, indent=4, default=str)
+        yield document
 
 
 class CursedData:
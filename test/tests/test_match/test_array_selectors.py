@@ -2,6 +2,7 @@ from collections import abc
 from datetime import datetime
 
 from src.dict_search.dict_search import DictSearch
+from src.dict_search.exceptions import PreconditionError
 from src.dict_search.operators import exceptions
 from src.dict_search.operators.operators import array_selectors as aop
 
@@ -74,6 +75,16 @@ class TestSlice(Base.SearchMixin, Base.ExceptionsMixin):
         op = aop.Slice(":2")
         self.assertEqual(op(data), data[:2])
 
+    def test_slice_object(self):
+        for slice_str, assert_slice in [
+            (":", slice(None)),
+            ("-2:", slice(-2, None)),
+            ("1::", slice(1, None)),
+            ("::-1", slice(None, None, -1)),
+            ("1:-1:2", slice(1, -1, 2)),
+        ]:
+            self.assertEqual(aop.Slice(slice_str).slice, assert_slice)
+
     def test_slice_all_patterns(self):
         search = DictSearch()
         data = {"a": [0, 1, 2, 3, 4, 5]}
@@ -159,8 +170,30 @@ class TestWhere(Base.SearchMixin, Base.ExceptionsMixin):
             return False
 
     def test_implementation(self):
-        search = DictSearch()
         data = [{"d": 1}, {"d": 0}, {"a": 1}, {"a": 1, "d": 0}]
         op = aop.Where({"d": 0})
-        result = op(data, search)
+        result = op(data, lambda d_point, query: DictSearch(match_query=query)(d_point) is not None)
         self.assertEqual(result, [data[1], data[3]])
+
+    def test_sub_query_semantics(self):
+        d_point = {"y": 2, "a": [{"x": 1, "y": 1}, {"x": 2, "y": 3}, 3, "s"]}
+        for compile_match in [False, True]:
+            for where, expected in [
+                ([{"x": {"$comp": [["y"]]}}, [{"x": 1, "y": 1}]], True),  # $comp resolved against the element
+                ([{"$not": [{"x": 1}]}, [{"x": 2, "y": 3}]], True),  # elements that are not dicts are skipped
+                ([None, [{"x": 1, "y": 1}, {"x": 2, "y": 3}]], True),
+            ]:
+                search = DictSearch(match_query={"a": {"$where": where}}, compile_match=compile_match)
+                assert (search(d_point) is not None) is expected
+            with self.assertRaises(PreconditionError):
+                DictSearch(match_query={"a": {"$where": [[1], [1]]}}, compile_match=compile_match)
+
+    def test_sub_query_parsed_once(self):
+        for compile_match in [False, True]:
+            match_query = {"products": {"$where": [{"product": data.PROD_PC}, {"$all": {"cost": {"$lt": 50000}}}]}}
+            search = DictSearch(match_query=match_query, compile_match=compile_match)
+            used_operators = list(search.used_operators)
+            for d_point in data.get_data():
+                search(d_point)
+            assert search.match_query is match_query
+            assert search.used_operators == used_operators
@@ -0,0 +1,69 @@
+import random
+from unittest import TestCase, skipIf
+
+from src.dict_search import ColumnarCollection, DictSearch
+from src.dict_search import columnar
+from src.dict_search import exceptions
+from test.fixtures.data import data as financial_data
+
+
+@skipIf(columnar.np is None, "numpy is not installed")
+class TestColumnarCollection(TestCase):
+    paths = [["fy"], ["liab", "cur"], ["liab", "non_cur", "a"], ["assets", "non_cur"], ["name"], ["ratio"]]
+
+    def setUp(self) -> None:
+        random.seed(0)
+        self.data = [
+            {
+                **d_point,
+                "fy": d_point["fy"] + random.randint(0, 8),
+                "liab": {"cur": random.randint(0, 5000), "non_cur": {"a": random.randint(0, 20000)}},
+                "ratio": random.choice([random.random(), float("nan"), True]),
+            }
+            for d_point in financial_data * 50
+        ]
+        self.data += [{"fy": 2015}, {"liab": 3}, [1, 2]]
+        self.collection = ColumnarCollection(self.data, self.paths)
+
+    def test_columns(self):
+        assert ("name",) not in self.collection.columns and len(self.collection.columns) == len(self.paths) - 1
+        assert self.collection.columns[("fy",)].values.dtype.kind == "i"
+        assert self.collection.columns[("ratio",)].values.dtype.kind == "f"
+
+    def test_same_results(self):
+        for query, exact in [
+            ({"fy": 2015}, True),
+            ({"fy": {"$in": [2012, 2014]}, "liab": {"cur": {"$gte": 2500}}}, True),
+            ({"liab": {"non_cur": {"a": {"$lt": 5000}}, "cur": {"$ne": 10}}}, True),
+            ({"$or": [{"fy": {"$lte": 2012}}, {"liab": {"cur": {"$gt": 4900}}}]}, True),
+            ({"$not": [{"fy": {"$gt": 2013}}, {"ratio": {"$lt": 0.5}}]}, True),
+            ({"liab": {"$not_any": [{"cur": {"$gt": 100}}, {"non_cur": {"a": 3}}]}}, True),
+            ({"ratio": {"$gt": 0.9}}, True),
+            ({"ratio": True}, True),
+            ({"fy": {"$gt": 2013}, "name": {"$regex": "^m"}}, False),
+            ({"$and": [{"fy": 2014}, {"assets": {"non_cur": {"$gt": 3000}}}]}, True),
+            ({"$and": [{"fy": 2014}, {"name": {"$in": ["gld", "mdb"]}}]}, False),
+            ({"$or": [{"fy": 2014}, {"name": "gld"}]}, False),
+            ({"fy": {"$gt": 2**60}}, True),
+            ({"fy": {"$gt": 2**64}}, False),
+        ]:
+            for compile_match in [False, True]:
+                search = DictSearch(match_query=query, compile_match=compile_match)
+                self.assertEqual(list(search.filter(self.collection)), list(search.filter(self.data)))
+                assert self.collection.mask(search)[1] is exact, query
+
+    def test_select(self):
+        search = DictSearch(match_query={"fy": {"$gte": 2016}}, select_query={"name": 1, "liab": {"cur": 1}})
+        self.assertEqual(list(search.filter(self.collection)), list(search.filter(self.data)))
+
+    def test_configured_operator(self):
+        search = DictSearch(match_query={"fy": {"$gt": 2015}}, ops_init_config={"gt": {"ignored_types": bool}})
+        assert self.collection.mask(search) == (None, False)
+        self.assertEqual(list(search.filter(self.collection)), list(search.filter(self.data)))
+
+
+@skipIf(columnar.np is not None, "numpy is installed")
+class TestColumnarWithoutNumpy(TestCase):
+    def test_import_error(self):
+        with self.assertRaises(exceptions.OptionalDependencyError):
+            ColumnarCollection([{"a": 1}], ["a"])
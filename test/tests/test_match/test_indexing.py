@@ -0,0 +1,65 @@
+from datetime import datetime
+from unittest import TestCase
+
+from src.dict_search import DictSearch, IndexedCollection
+from test.new_fixtures import generate_fixtures
+
+
+class TestIndexedCollection(TestCase):
+    paths = [["id"], ["info", "origin"], ["info", "arrival"], ["combustible_usage(L)"], ["reviewed"], ["checksum"]]
+
+    def setUp(self) -> None:
+        self.data = list(generate_fixtures(500))
+        self.collection = DictSearch.build_index(self.data, self.paths)
+
+    def assert_same_results(self, search: DictSearch):
+        try:
+            expected = list(search.filter(self.data))
+        except Exception as e:  # documents with CursedData values must still be evaluated
+            with self.assertRaises(type(e)):
+                list(search.filter(self.collection))
+            return
+        self.assertEqual(list(search.filter(self.collection)), expected)
+
+    def test_same_results(self):
+        for query in [
+            {"id": 7},
+            {"id": {"$in": [1, 3, 300, "a"]}, "info": {"origin": "Spain"}},
+            {"info": {"origin": {"$eq": "Spain"}, "arrival": {"$gte": datetime(2022, 7, 1)}}},
+            {"combustible_usage(L)": {"$gt": 5000, "$lte": 8000}},
+            {"$and": [{"combustible_usage(L)": {"$lt": 4000}}, {"info": {"origin": "Sudan"}}]},
+            {"$or": [{"id": 1}, {"id": 2}]},
+            {"reviewed": True},
+            {"reviewed": 1.0},
+            {"checksum": ["1", 1, complex(1, 0)]},
+            {"info": {"origin": {"$regex": "^S"}}},
+        ]:
+            for compile_match in [False, True]:
+                self.assert_same_results(DictSearch(match_query=query, compile_match=compile_match))
+
+    def test_narrowing(self):
+        search = DictSearch(match_query={"id": {"$in": [3, 4]}, "info": {"origin": {"$regex": "^S"}}})
+        assert self.collection.candidates(search) == [3, 4]
+        search = DictSearch(match_query={"combustible_usage(L)": {"$gt": 9000}})
+        candidates = self.collection.candidates(search)
+        assert all(self.data[pos]["combustible_usage(L)"] > 9000 for pos in candidates)
+        assert DictSearch.build_index(self.data, []).candidates(search) is None
+        assert self.collection.candidates(DictSearch(match_query={"$or": [{"id": 1}, {"id": 2}]})) is None
+
+    def test_mixed_types(self):
+        data = [{"a": 1}, {"a": "1"}, {"a": 2.5}, {"a": float("nan")}, {"a": [1]}, {"b": 1}, {"a": None}]
+        collection = IndexedCollection(data, ["a"])
+        search = DictSearch(match_query={"a": 1})
+        assert list(search.filter(collection)) == [{"a": 1}]
+        assert collection.candidates(search) == [0, 4]
+        search = DictSearch(match_query={"a": {"$gt": 2}}, ops_init_config={"gt": {"expected_exc": TypeError}})
+        assert list(search.filter(collection)) == [{"a": 2.5}]
+        with self.assertRaises(TypeError):
+            list(DictSearch(match_query={"a": {"$gt": 2}}).filter(collection))
+
+    def test_configured_operator_not_narrowed(self):
+        data = [{"a": 1}, {"a": "1"}]
+        search = DictSearch(match_query={"a": {"$gt": 2}}, ops_init_config={"gt": {"expected_exc": {TypeError: True}}})
+        collection = IndexedCollection(data, ["a"])
+        assert collection.candidates(search) is None
+        assert list(search.filter(collection)) == [{"a": "1"}]
@@ -1,8 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import pickle
 import re
 
 from src.dict_search import DictSearch
-from src.dict_search.utils import find_value
+from src.dict_search.utils import IndexMarker, find_value
 from src.dict_search.operators import exceptions
 from src.dict_search.operators.operators import low_level_operators as lop
 
@@ -54,13 +56,30 @@ class TestIs(Base.OperatorMixin, Base.SearchMixin):
 
 class TestIn(Base.OperatorMixin, Base.SearchMixin):
     values = [COUNTRY_ARGENTINA, COUNTRY_SPAIN]
-    operator_checks = lop.In([1]), 1, 2
+    operator_checks = [
+        (lop.In([1]), 1, 2),
+        (lop.In([1, [2], {"a": 1}]), [True, 1.0, [2], {"a": 1}], [[1], 2, 3.5, {"a": 2}]),
+        (lop.In({True, "x"}), [1, "x"], [0, "y"]),
+        (lop.In("abc"), ["b", "bc"], ["d", "ac"]),
+    ]
     search_checks = DictSearch(match_query={"info": {"origin": {"$in": values}}}), lambda x: x["info"]["origin"] in TestIn.values
 
+    def test_reassign_comp(self):
+        search = DictSearch(match_query={"a": {"$in": [1, 2]}, "b": {"$nin": [1, 2]}})
+        search.get_operator("in").comp, search.get_operator("nin").comp = [3, [4]], [3, [4]]
+        assert search({"a": 3, "b": 1}) and search({"a": [4], "b": 2})
+        assert not search({"a": 1, "b": 1}) and not search({"a": 3, "b": 3})
+        op = pickle.loads(pickle.dumps(search.get_operator("in")))
+        assert op.comp == [3, [4]] and op(3) and not op(1)
+
 
 class TestNotIn(Base.OperatorMixin, Base.SearchMixin):
     values = [COUNTRY_ARGENTINA, COUNTRY_SPAIN]
-    operator_checks = lop.NotIn([1]), 2, 1
+    operator_checks = [
+        (lop.NotIn([1]), 2, 1),
+        (lop.NotIn([1, [2], {"a": 1}]), [[1], 2, 3.5, {"a": 2}], [True, 1.0, [2], {"a": 1}]),
+        (lop.NotIn("abc"), ["d", "ac"], ["b", "bc"]),
+    ]
     search_checks = DictSearch(match_query={"info": {"origin": {"$nin": values}}}), lambda x: x["info"]["origin"] not in TestNotIn.values
 
 
@@ -143,3 +162,34 @@ class TestFind(Base.SearchMixin, Base.ExceptionsMixin):
         assert lop.Find("c")(self.fixture_data) == 12
         assert lop.Find("c", candidates=-1)(self.fixture_data) == [12, 44]
         assert not lop.Find("z")(self.fixture_data)
+
+    def test_find_value_paths(self):
+        data = {"a": {"x": {"b": 1}, "b": [{"a": {"b": 2}}, 3]}, "b": 4}
+        results = find_value(data, ["a", "b"], candidates=-1, iterables=list)
+        assert [r.result for r in results] == [1, [{"a": {"b": 2}}, 3], 2]
+        assert results[0].prev_keys == ["a", "x", "b"]
+        assert results[2].prev_keys == ["a", "b", 0, "a", "b"] and isinstance(results[2].prev_keys[2], IndexMarker)
+        assert find_value(data, ["a", "b"], max_depth=0).prev_keys == []
+        assert find_value(data, [], index=None)[0].result is data
+        assert find_value(deep := {"k": {"k": {"k": 0}}}, ["k", "k", "k"], max_depth=1).found is False
+        assert find_value(deep, ["k", "k", "k"], max_depth=2).prev_keys == ["k", "k", "k"]
+
+    def test_learn_paths(self):
+        data = [{"a": {"x": [{"b": i}]}, "c": {"b": -i}} for i in range(5)] + [{"c": {"b": 9}}, {"d": 1}]
+        op = lop.Find("b", iterables=list, learn_paths=True)
+        assert [op(d_point) for d_point in data[:-1]] == [0, 1, 2, 3, 4, 9]
+        assert not op(data[-1])
+        assert op.learned_paths == [("c", "b"), ("a", "x", 0, "b")]
+        assert (op.path_hits, op.path_misses) == (4, 3) and op.path_hit_rate == 4 / 7
+        search = DictSearch(match_query={"$find": ["b", -3]}, ops_init_config={"find": {"learn_paths": True}})
+        assert list(search.filter(data)) == [data[3]]
+        assert search.get_operator("find").path_hits == 5
+
+    def test_learn_paths_threads(self):
+        data = [{"a": {"x": [{"b": i}]}} if i % 3 else {"c": {"d": {"b": i}}} for i in range(3000)]
+        op = lop.Find("b", iterables=list, learn_paths=True, learned_paths_size=1)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert list(executor.map(op, data, chunksize=10)) == list(range(3000))
+        assert op.path_hits + op.path_misses == 3000 and len(op.learned_paths) == 1
+        op = pickle.loads(pickle.dumps(op))
+        assert op(data[1]) == 1 and op.learned_paths == [("a", "x", 0, "b")]
@@ -1,14 +1,36 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from datetime import datetime
+from functools import cache
+import gc
+import pickle
+import tracemalloc
 from pprint import pprint
 from urllib import parse
 
-from src.dict_search import DictSearch
+from src.dict_search import DictSearch, MatchStats
 from src.dict_search import HighLevelOperator, MatchOperator
 from src.dict_search import Operator
 from src.dict_search import exceptions
+from src.dict_search import plan_cache
+from src.dict_search.operators import exceptions as op_exceptions
 from src.dict_search.operators.operators import low_level_operators as lop
 from unittest import TestCase
 from test.new_fixtures import CursedData
+from test import utils as test_utils
 from test.utils import DemoOpModulo
+from test.new_fixtures.data import (
+    get_data,
+    COMPANY_COSCO,
+    COMPANY_MSC,
+    COUNTRY_MORROCCO,
+    COUNTRY_SPAIN,
+    COUNTRY_USA,
+    PROD_CAR,
+    PROD_GR,
+    PROD_PC,
+)
 
 
 class TestDictSearch(TestCase):
@@ -50,6 +72,155 @@ class TestDictSearch(TestCase):
         results = list(search.filter(self.get_consumable_fixture()))
         assert results and isinstance(results[0]["a"], tuple)
 
+    def test_shared_between_threads(self):
+        data = [{"a": i % 7, "b": {"c": i % 7 if i % 3 else -1}, "d": [i % 5, {"e": i}]} for i in range(3000)]
+        for compile_match in [False, True]:
+            search = DictSearch(
+                match_query={"a": {"$comp": [["b", "c"]]}, "d": {"$any": {"$in": [0, 1]}}},
+                select_query={"b": 0},
+                compile_match=compile_match,
+            )
+            expected = [search(d) for d in data]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(search, data, chunksize=50))
+            assert any(expected)
+            self.assertEqual(results, expected)
+
+    def test_filter_generator(self):
+        consumed = []
+        search = DictSearch(match_query={"products": {"$any": {"product": PROD_CAR}}}, select_query={"id": 1})
+        results = search.filter(consumed.append(d_point) or d_point for d_point in get_data())
+        assert isinstance(results, Iterator) and not consumed
+        first = next(results)
+        assert 0 < len(consumed) < len(get_data())
+        self.assertEqual([first, *results], list(search.filter(get_data())))
+
+    def test_parallel_filter(self):
+        build_data = lambda: ({"a": i % 7, "b": {"c": i % 5, "d": i}} for i in range(2500))
+        search = DictSearch(match_query={"b": {"c": {"$in": [1, 2]}}}, select_query={"b": {"d": 1}})
+        expected = list(search.filter(build_data()))
+        self.assertEqual(list(search.parallel_filter(build_data(), workers=2, chunksize=100)), expected)
+        results = search.parallel_filter(build_data(), workers=3, chunksize=64, ordered=False)
+        self.assertEqual(sorted(r["b"]["d"] for r in results), [r["b"]["d"] for r in expected])
+
+    def test_pickle(self):
+        queries = [
+            {"info": {"origin": {"$comp": [["info", "ship_country"]]}}},
+            {"products": {"$any": {"cost": {"$gt": 50000}}}, "info": {"$or": [{"origin": COUNTRY_USA}, {"a": 1}]}},
+        ]
+        for query in queries:
+            for compile_match in [False, True]:
+                search = DictSearch(
+                    match_query=query,
+                    select_query={"id": 1},
+                    ops_init_config={"gt": {"expected_exc": TypeError}},
+                    compile_match=compile_match,
+                )
+                unpickled = pickle.loads(pickle.dumps(search))
+                assert unpickled.match_query == query and unpickled.compile_match == compile_match
+                self.assertEqual(list(unpickled.filter(get_data())), list(search.filter(get_data())))
+                assert unpickled.get_operator("gt") is None or unpickled.get_operator("gt").expected_exc
+
+    def test_pickle_current_state(self):
+        data = [{"a": iter([1, 3]), "b": 1}, {"a": iter([3]), "b": 2}, {"a": iter(["x"]), "b": 1}]
+        search = DictSearch(match_query={"a": {"$any": {"$gt": 2}}, "b": 1}, select_query={"a": 1})
+        search.consumable_iterators, search.coerce_list = Iterator, True
+        search.ops_init_config[search.op__gt] = {"expected_exc": TypeError}
+        search.compile_match = True
+        search.plan_match()
+        unpickled = pickle.loads(pickle.dumps(search))
+        assert (unpickled.consumable_iterators, unpickled.coerce_list) == (Iterator, True)
+        assert unpickled.compile_match and unpickled.ops_init_config == search.ops_init_config
+        self.assertEqual(list(unpickled.filter(data)), [{"a": [1, 3]}])
+        assert list(unpickled.match_query_parsed) == list(search.match_query_parsed) == ["b", "a"]
+        search.plan_match([{"a": [3], "b": 1}])
+        with self.assertRaises(exceptions.PickleStateError):
+            pickle.dumps(search)
+        search = DictSearch()
+        search._load_ops_from_module(test_utils)
+        with self.assertRaises(exceptions.PickleStateError):
+            pickle.dumps(search)
+
+    def test_pickle_operator(self):
+        op = pickle.loads(pickle.dumps(lop.Greater(2, expected_exc={TypeError: True}, allowed_types=(int, str))))
+        assert op(3) and not op(1.5) and op("a") and op.expected_exc == {TypeError: True}
+
+    def test_match_stats(self):
+        calls = []
+        query = {"a": 1, "b": {"c": {"$func": lambda x: calls.append(x) or True}}, "$or": [{"d": 1}, {"e": 2}]}
+        search = DictSearch(match_query=query)
+        search.match_stats = MatchStats()
+        data = [{"a": 2, "b": {"c": 0}}, {"a": 1, "b": {"c": 0}, "d": 1}, {"a": 1, "b": {}}, {"a": 1, "b": {"c": 1}}]
+        assert list(search.filter(data)) == [data[1]]
+        assert calls == [0, 1]
+        assert search.match_stats.documents == 4
+        assert search.match_stats.histogram == {1: 1, 4: 1, 2: 1, 5: 1}
+        assert search.match_stats.mean == 3
+        search.compile_match = True
+        search.match_stats = MatchStats()
+        assert list(search.filter(data)) == [data[1]] and search.match_stats.documents == 0
+
+    def test_operator_cache_size(self):
+        search = DictSearch(
+            match_query={"name": {"$regex": "^S"}, "id": {"$in": [1, 2]}},
+            ops_init_config={"regex": {"cache_size": 16}, "in": {"cache_size": 16}},
+        )
+        data = [{"name": name, "id": 1} for name in ["Spain", "Sudan", "Chad"] * 10]
+        assert len(list(search.filter(data))) == 20
+        regex, in_op = search.get_operator("regex"), search.get_operator("in")
+        assert (regex.cache_hits, regex.cache_misses) == (27, 3)
+        assert (in_op.cache_hits, in_op.cache_misses) == (19, 1)
+
+    def test_nested_key_paths(self):
+        query = {
+            "a": {"b": {"c": {"$gt": 1}}},
+            "d": {"e": {"f": 1, "g": {"h": {"$any": {"i": 1}}}}},
+            "$or": [{"j": {"k": {"l": 1}}}, {"j": {"k": {"$all": {"$inst": int}}}}],
+        }
+        data = [
+            {"a": {"b": {"c": 2}}, "d": {"e": {"f": 1, "g": {"h": iter([{"i": 1}])}}}, "j": {"k": iter([1, 2])}},
+            {"a": {"b": {"c": 2}}, "d": {"e": {"f": 1, "g": {"h": [{"i": 1}]}}}, "j": {"k": {"l": 1}}},
+            {"a": {"b": 2}, "d": {"e": {"f": 1, "g": {"h": [{"i": 1}]}}}, "j": {"k": {"l": 1}}},
+            {"a": {"b": {"c": 2}}, "d": {"e": {"f": 1, "g": []}}, "j": {"k": {"l": 1}}},
+        ]
+        for compile_match in [False, True]:
+            search = DictSearch(match_query=query, compile_match=compile_match, consumable_iterators=Iterator)
+            documents = deepcopy(data)
+            assert list(search.filter(documents)) == [documents[0], documents[1]]
+            assert documents[0]["d"]["e"]["g"]["h"] == [{"i": 1}] and documents[0]["j"]["k"] == [1, 2]
+        search = DictSearch(match_query=query)
+        search.match_stats = MatchStats()
+        list(search.filter(deepcopy(data)))
+        assert search.match_stats.histogram == {9: 1, 6: 1, 1: 1, 3: 1}
+
+    def test_used_operators_rebuilt(self):
+        search = DictSearch(select_query={"products": {"$where": [{"cost": {"$gt": 1}}, 1]}})
+        for i in range(1000):
+            search.match_query = {"products": {"$any": {"cost": {"$gt": i}}}, "id": {"$in": [i]}}
+        assert sorted(op.name for op in search.used_operators) == ["any", "gt", "gt", "in"]
+        assert search.get_operator("gt").comp == 999
+        assert search.get_operator("gt", {"comp": 1}).comp == 1
+        search.match_query = None
+        assert [op.name for op in search.used_operators] == ["gt"]
+
+    def test_reassignment_memory_bounded(self):
+        search = DictSearch(select_query={"products": {"$where": [{"cost": {"$gt": 1}}, 1]}})
+
+        def reassign(n):
+            for i in range(n):
+                search.match_query = {"products": {"$where": [{"product": i}, {"$all": {"cost": {"$lt": i}}}]}}
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.start()
+        try:
+            warm = reassign(500)
+            grown = reassign(5000) - warm
+        finally:
+            tracemalloc.stop()
+        assert grown < 64 * 1024  # a single leaked operator per assignment would take megabytes
+        assert sorted(op.name for op in search.used_operators) == ["all", "eq", "gt", "lt", "where"]
+
 
 class TestMatchExceptions(TestCase):
     def test_ops_config_error(self):
@@ -148,6 +319,87 @@ class TestMatching(TestCase):
         self.assertEqual(results, [data[1], data[3]])
         print(results)
 
+    def test_shared_operator_registry(self):
+        search, other = DictSearch(), DictSearch(match_query={"a": {"$gt": 1}})
+        assert search.all_match_ops is other.all_match_ops and search.op__gt == "$gt"
+        custom = DictSearch(ops_custom=DemoOpModulo)
+        assert "$modulo" in custom.all_match_ops and "$modulo" not in search.all_match_ops
+        assert custom.all_match_ops is DictSearch(ops_custom=[DemoOpModulo]).all_match_ops
+        assert DictSearch(ops_str="#").op__gt == "#gt"
+        with self.assertRaises(TypeError):
+            search.all_match_ops["$gt"] = DemoOpModulo
+
+    def test_plan_cache(self):
+        plans = plan_cache.PLAN_CACHE
+        plans.maxsize = 4
+        plans.clear()
+        try:
+            query = {"b": {"$any": {"$gt": 2}}, "a": {"b": 1}}
+            search, other = DictSearch(match_query=query), DictSearch(match_query=deepcopy(query))
+            assert plans.cache_info() == (1, 1, 4, 1) and other.match_query_parsed is search.match_query_parsed
+            other.consumable_iterators = Iterator
+            data = {"a": {"b": 1}, "b": iter([1, 3])}
+            assert other(data) == data and data["b"] == [1, 3]
+            data = {"a": {"b": 1}, "b": iter([1, 3])}
+            assert search(data) == data and isinstance(data["b"], Iterator)
+            for key_changes in [{"compile_match": True}, {"ops_init_config": {"gt": {"expected_exc": TypeError}}}]:
+                assert DictSearch(match_query=query, **key_changes).match_query_parsed is not search.match_query_parsed
+            for value in [True, 1.0]:
+                assert DictSearch(match_query={"a": {"b": value}}).get_operator("$eq") is None
+            assert plans.cache_info() == (1, 5, 4, 4)
+            DictSearch(match_query={"a": {"$eq": bytearray(b"a")}})
+            assert plans.cache_info() == (1, 5, 4, 4)
+            other.plan_match([{"a": {"b": 2}, "b": [3]}])
+            assert list(other.match_query_parsed) == ["a", "b"] and list(search.match_query_parsed) == ["b", "a"]
+            search, other = DictSearch(match_query=query), DictSearch(match_query=query)
+            assert other.match_query_parsed is search.match_query_parsed
+            other.get_operator("gt").comp = 0
+            assert other.match_query_parsed is not search.match_query_parsed and search.get_operator("gt").comp == 2
+            data = {"a": {"b": 1}, "b": [1]}
+            assert other(data) == data and search(data) is None
+            plans.maxsize = 1
+            assert len(plans) == 1
+            with self.assertRaises(exceptions.PlanCacheSizeError):
+                plans.maxsize = -1
+        finally:
+            plans.maxsize = 0
+            plans.clear()
+
+    def test_equal_kind_strings(self):
+        kind = "".join(["low", "_level"])  # equal to the kind constant but another object, as if unpickled
+        for compile_match in [False, True]:
+            search = DictSearch(compile_match=compile_match)
+            search._load_ops_from_module(test_utils, kind=kind)
+            search.match_query = {"a": {"$modulo": [2, 1]}}
+            assert search({"a": 3}) and not search({"a": 2})
+
+    def test_custom_op_cache(self):
+        data = [{"a": 3}, {"a": 2}, {"a": 3}, {"a": 3.0}]
+        query = {"a": {"$modulo": [2, 1]}}
+        search = DictSearch(match_query=query, ops_custom=DemoOpModulo, ops_init_config={"modulo": {"cache": "batch"}})
+        op = search.get_operator("modulo")
+        for _ in range(2):
+            assert list(search.filter(data)) == [data[0], data[2], data[3]]
+            assert (op.cache_hits, op.cache_misses) == (1, 3)
+        assert list(search.filter(data[:1])) == [data[0]] and op.cache_misses == 1
+        search = DictSearch(match_query=query, ops_custom=DemoOpModulo, ops_init_config={"modulo": {"cache": cache}})
+        list(search.filter(data))
+        list(search.filter(data))
+        assert search.get_operator("modulo").cache_hits == 5
+        with self.assertRaises(op_exceptions.OperatorCacheError):
+            DictSearch(match_query=query, ops_custom=DemoOpModulo, ops_init_config={"modulo": {"cache": "a"}})
+
+    def test_compiled_value_not_memoized(self):
+        memoized = []
+
+        def memo(func):
+            return lambda data: memoized.append(data) or func(data)
+
+        for compile_match in [False, True]:
+            config = {"eq": {"cache": memo}}
+            search = DictSearch(match_query={"a": {"$any": 1}}, compile_match=compile_match, ops_init_config=config)
+            assert list(search.filter([{"a": [2, 1]}, {"a": [3]}])) == [{"a": [2, 1]}] and memoized == []
+
     def test_get_operator(self):
         func = lambda x, y: x * 2 == y
         search = DictSearch(
@@ -156,3 +408,46 @@ class TestMatching(TestCase):
         self.assertTrue(search.get_operator("or"))
         self.assertNotEqual(search.get_operator("comp", {"func": func}), search.get_operator("comp"))
         self.assertEqual(len(search.get_operator("comp", first=False)), 2)
+
+
+class TestCompiledMatch(TestCase):
+    queries = [
+        {"id": 1},
+        {"info": {"origin": COUNTRY_USA, "departure": {"$gte": datetime(2022, 6, 1)}}},
+        {"info": {"$or": [{"origin": COUNTRY_SPAIN}, {"ship_country": COUNTRY_MORROCCO}]}},
+        {"info": {"$not": [{"origin": COUNTRY_USA}], "port_code": {"$regex": "02"}}},
+        {"info": {"$match": {2: [{"origin": COUNTRY_SPAIN}, {"ship_country": COUNTRY_MORROCCO}, {"in_route": 1}]}}},
+        {"info": {"origin": {"$comp": [["info", "ship_country"]]}}},
+        {"products": {"$all": {"cost": {"$gt": 30000}}}},
+        {"products": {"$any": {"product": PROD_CAR}}},
+        {"products": {"$countgte": {2: {"product": PROD_PC}}}},
+        {"products": {"$index": [0, {"product": PROD_GR}]}},
+        {"containers": {"$slice": [":2", [COMPANY_COSCO, COMPANY_MSC]]}},
+        {"products": {"$where": [{"product": PROD_PC}, {"$all": {"cost": {"$lt": 50000}}}]}},
+        {"$find": ["ship_country", COUNTRY_MORROCCO]},
+        {"$find": ["departure", {"$lt": datetime(2022, 6, 1)}]},
+        {"$and": [{}]},
+        {"taxes": {"$inst": list}, "in_route": False},
+    ]
+
+    def test_compiled_equals_interpreted(self):
+        for query in self.queries:
+            interpreted = list(DictSearch(match_query=query).filter(get_data()))
+            compiled = list(DictSearch(match_query=query, compile_match=True).filter(get_data()))
+            self.assertEqual([d["id"] for d in interpreted], [d["id"] for d in compiled], msg=query)
+
+    def test_compiled_ops_config(self):
+        ops_config = {"gt": {"expected_exc": TypeError}, HighLevelOperator: {"allowed_types": dict}}
+        query = {"info": {"$or": [{"departure": {"$gt": "2022"}}, {"origin": COUNTRY_SPAIN}]}}
+        search = DictSearch(match_query=query, ops_init_config=ops_config, compile_match=True)
+        results = list(search.filter(get_data()))
+        assert results and all(d["info"]["origin"] == COUNTRY_SPAIN for d in results)
+
+    def test_toggle_compile_match(self):
+        search = DictSearch(match_query={"products": {"$any": {"product": PROD_CAR}}})
+        expected = [d["id"] for d in search.filter(get_data())]
+        search.compile_match = True
+        assert search.match_query_compiled is not None
+        self.assertEqual([d["id"] for d in search.filter(get_data())], expected)
+        search.compile_match = False
+        self.assertEqual([d["id"] for d in search.filter(get_data())], expected)
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from src.dict_search import DictSearch
+from test.new_fixtures import generate_fixtures
+
+
+class TestPlanner(TestCase):
+    queries = [
+        {"info": {"origin": {"$regex": "^S"}, "paid": "yes"}, "id": {"$lt": 300}},
+        {"$and": [{"info": {"iterms": {"$func": lambda x: x.startswith("EX")}}}, {"passengers": {"leisure": 0}}]},
+        {"$or": [{"info": {"origin": {"$regex": "an$"}}}, {"id": {"$ne": 3}}]},
+        {"cargo": {"products": {"$any": {"origin": "Spain", "weight": {"$gt": 1000}}}}, "info": {"paid": "yes"}},
+        {"$not": [{"info": {"origin": {"$regex": "S"}}}, {"id": 2}]},
+    ]
+
+    def test_reorder(self):
+        search = DictSearch(match_query={"info": {"origin": {"$regex": "^S"}}, "id": {"$find": ["a", 1]}, "b": 1})
+        assert list(search.match_query_parsed) == ["info", "id", "b"]
+        search = DictSearch(
+            match_query={"info": {"origin": {"$regex": "^S"}}, "id": {"$find": ["a", 1]}, "b": 1}, reorder_match=True
+        )
+        assert list(search.match_query_parsed) == ["b", "info", "id"]
+        search = DictSearch(match_query={"$or": [{"a": {"$regex": "a"}}, {"a": {"$ne": 1}}]}, reorder_match=True)
+        assert list(search.match_query_parsed["$or"].query[0]["a"]) == ["$ne"]
+
+    def test_same_results(self):
+        data = list(generate_fixtures(300))
+        for query in self.queries:
+            for compile_match in [False, True]:
+                search = DictSearch(match_query=query, compile_match=compile_match)
+                expected = [d_point["id"] for d_point in search.filter(data)]
+                search.reorder_match = True
+                search.match_query = query
+                assert [d_point["id"] for d_point in search.filter(data)] == expected
+                search.plan_match(data[:50])
+                assert search.match_pass_rates
+                assert [d_point["id"] for d_point in search.filter(data)] == expected
+
+    def test_sample_pass_rates(self):
+        data = [{"a": 1, "b": i} for i in range(100)]
+        search = DictSearch(match_query={"a": 1, "b": 7})
+        search.plan_match()
+        assert list(search.match_query_parsed) == ["a", "b"]
+        search.plan_match(data)
+        assert list(search.match_query_parsed) == ["b", "a"]
+        assert sorted(search.match_pass_rates.values()) == [0.01, 1]
+        search.match_query = {"a": 1}
+        assert search.match_pass_rates == {}
@@ -1,8 +1,406 @@
-import logging
-from abc import ABC, abstractmethod
-from functools import partial, cache, lru_cache
-from types import FunctionType
-from typing import Any, Type, Union
-
-from src.dict_search.operators import exceptions
-from src.dict_search import Operator
+import argparse
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import timeit
+import tracemalloc
+from collections import deque
+from functools import partial
+
+from src.dict_search import ColumnarCollection, DictSearch
+from src.dict_search import columnar
+from src.dict_search import plan_cache
+from src.dict_search.utils import find_value
+from test.new_fixtures import generate_fixtures
+
+SUITE_SIZES = [10**4, 10**5, 10**6]
+SUITE_POOL = 10**4  # distinct generated documents, larger sizes repeat them
+SUITE = {
+    "low_level": {
+        "match_query": {
+            "id": {"$gte": 100},
+            "info": {"origin": {"$in": ["Spain", "Italy", "Peru"]}, "paid": {"$regex": "^[yY]"}},
+            "combustible_usage(L)": {"$lt": 12000},
+        }
+    },
+    "high_level": {
+        "match_query": {
+            "$or": [{"info": {"paid": "yes"}}, {"$and": [{"crew": {"$gt": 10}}, {"id": {"$ne": 1}}]}],
+            "$not": [{"info": {"origin": "Spain"}}],
+        }
+    },
+    "array": {"match_query": {"cargo": {"products": {"$any": {"weight": {"$gt": 1400}, "origin": "USA"}}}}},
+    "count": {"match_query": {"cargo": {"products": {"$countgte": {2: {"product": {"$in": ["BMW", "Audi"]}}}}}}},
+    "match": {"match_query": {"info": {"$match": {2: [{"origin": "Spain"}, {"paid": "yes"}, {"Inco": "DAP"}]}}}},
+    "selectors": {
+        "select_query": {
+            "cargo": {"products": {"$where": [{"weight": {"$gt": 1000}}, {"product": 1}]}},
+            "ports": {"$slice": {"0:2": 1}},
+            "checksum": {"$index": {0: 1}},
+        }
+    },
+    "selection": {
+        "select_query": {
+            "id": 1,
+            "info": {"origin": 1, "arrival": 1},
+            "cargo": {"products": {"$array": {"product": 1, "weight": 1}}},
+        }
+    },
+    "match_select": {
+        "match_query": {"info": {"origin": {"$in": ["Sudan", "USA"]}}},
+        "select_query": {"id": 1, "info": {"origin": 1}, "combustible_usage(L)": 1},
+    },
+}
+
+
+def deep_query(depth: int, leaf: dict) -> dict:
+    query = leaf
+    for level in reversed(range(depth)):
+        query = {f"k{level}": {"$and": [query, {"$or": [{"$is": None}, {"$inst": dict}]}]}}
+    return query
+
+
+def deep_document(depth: int, value) -> dict:
+    document = value
+    for level in reversed(range(depth)):
+        document = {f"k{level}": document}
+    return document
+
+
+def bench_dispatch(depth=12, n_docs=2000, repeat=5, **search_kwargs):
+    data = [deep_document(depth, {"v": i}) for i in range(n_docs)]
+    search = DictSearch(match_query=deep_query(depth, {"v": {"$gte": 0}}), **search_kwargs)
+    assert len(list(search.filter(data))) == n_docs
+    times = timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)
+    return statistics.mean(times), min(times)
+
+
+def count_dict_copies(func) -> int:
+    """Count the calls to dict.copy made while running func"""
+    calls = 0
+
+    def profile(frame, event, arg):
+        nonlocal calls
+        if event == "c_call" and arg.__name__ == "copy" and isinstance(arg.__self__, dict):
+            calls += 1
+
+    sys.setprofile(profile)
+    try:
+        func()
+    finally:
+        sys.setprofile(None)
+    return calls
+
+
+def bench_selection(select_query, n_docs=2000, repeat=5):
+    data = list(generate_fixtures(n_docs))
+    search = DictSearch(select_query=select_query)
+    copies = count_dict_copies(lambda: list(search.filter(data)))
+    times = timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)
+    return copies / n_docs, statistics.mean(times), min(times)
+
+
+def bench_wide_projection(n_fields=50, width=500, n_docs=2000, repeat=5):
+    data = [{f"k{i}": {"v": i, "w": [i] * 3} for i in range(width)} for _ in range(n_docs)]
+    search = DictSearch(select_query={f"k{i}": {"v": 1} for i in range(0, width, width // n_fields)})
+    times = timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)
+    return statistics.mean(times), min(times)
+
+
+def bench_slice(n_docs=2000, repeat=5):
+    data = list(generate_fixtures(n_docs))
+    match = DictSearch(match_query={"cargo": {"products": {"$slice": ["1:-1", {"$all": {"$inst": dict}}]}}})
+    select = DictSearch(select_query={"cargo": {"products": {"$slice": {"1:": 0}}}})
+    results = []
+    for search in [match, select]:
+        times = timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)
+        results.append((statistics.mean(times) / n_docs, min(times) / n_docs))
+    return results
+
+
+def soak_query_assignment(n_assignments=10**6, checkpoints=5):
+    """Peak RSS in KiB after each 1/checkpoints of n_assignments match query reassignments"""
+    search = DictSearch(select_query={"id": 1})
+    peaks = []
+    for i in range(n_assignments):
+        search.match_query = {"products": {"$where": [{"product": i}, {"$all": {"cost": {"$lt": i}}}]}}
+        if (i + 1) % (n_assignments // checkpoints) == 0:
+            peaks.append(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    return peaks
+
+
+def bench_index(n_docs=10**5, repeat=3):
+    data = list(generate_fixtures(n_docs))
+    collection = DictSearch.build_index(data, [["id"], ["info", "origin"], ["combustible_usage(L)"]])
+    results = []
+    for query in [
+        {"id": {"$in": [10, 20, 30]}},
+        {"info": {"origin": "Spain"}, "combustible_usage(L)": {"$gt": 9900}},
+    ]:
+        search = DictSearch(match_query=query)
+        scan = min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat))
+        indexed = min(timeit.repeat(lambda: list(search.filter(collection)), number=1, repeat=repeat))
+        results.append((query, scan, indexed))
+    return results
+
+
+def bench_planner(n_docs=20000, repeat=5):
+    data = list(generate_fixtures(n_docs))
+    query = {
+        "info": {"origin": {"$regex": "^(Sp|Su)"}, "iterms": {"$func": lambda x: "EX" in x}},
+        "cargo": {"products": {"$any": {"status": "Finished", "weight": {"$gt": 1500}}}},
+        "id": {"$lt": 100},
+    }
+    results = []
+    for reorder_match in [False, True]:
+        search = DictSearch(match_query=query, reorder_match=reorder_match)
+        if reorder_match:
+            search.plan_match(data[:200])
+        results.append(min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)))
+    return results
+
+
+def bench_operator_cache(n_docs=10**5, repeat=3):
+    data = list(generate_fixtures(n_docs))
+    query = {"info": {"origin": {"$regex": "^(S|C).*(n|d)$"}, "Inco": {"$func": lambda x: sum(map(ord, x * 200)) % 3}}}
+    results = []
+    for cache_size in [None, 256]:
+        ops_config = {"regex": {"cache_size": cache_size}, "func": {"cache_size": cache_size}}
+        search = DictSearch(match_query=query, ops_init_config=ops_config)
+        results.append(min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)))
+    return (*results, search.get_operator("regex").cache_hits, search.get_operator("regex").cache_misses)
+
+
+def _partial_chain(op):
+    """The implementation configured operators had before the checks were fused, one partial frame per check"""
+
+    def expected(func, *args):
+        try:
+            return func(*args)
+        except tuple(op.expected_exc) as e:
+            return op._expected_result(e)
+
+    def ignored(func, data, *args):
+        if isinstance(data, op.ignored_types):
+            return op.default_return
+        return func(data, *args)
+
+    def allowed(func, data, *args):
+        if not isinstance(data, op.allowed_types):
+            return op.default_return
+        return func(data, *args)
+
+    implementation = op.original_implementation
+    for wrapper in [expected, ignored, allowed]:
+        implementation = partial(wrapper, implementation)
+    return implementation
+
+
+def bench_configured_operator(n_docs=10**5, repeat=5):
+    """Seconds per call of a bare $gt, of a configured one through the former partial chain and fused, and seconds
+    to filter 'n_docs' documents with the configured $gt through the partial chain and fused"""
+    data = [{"a": i % 100 if i % 7 else str(i)} for i in range(n_docs)]
+    values = [d_point["a"] for d_point in data if not isinstance(d_point["a"], str)]
+    config = {"gt": {"expected_exc": TypeError, "allowed_types": (int, str), "ignored_types": bool}}
+    bare = DictSearch(match_query={"a": {"$gt": 50}}).get_operator("gt").implementation
+    search = DictSearch(match_query={"a": {"$gt": 50}}, ops_init_config=config)
+    op = search.get_operator("gt")
+    fused = op.implementation
+    calls, filters = [], []
+    for implementation in [bare, _partial_chain(op), fused]:
+        calls.append(min(timeit.repeat(lambda: list(map(implementation, values)), number=1, repeat=repeat)))
+    try:
+        for implementation in [_partial_chain(op), fused]:
+            op.implementation = implementation
+            filters.append(min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)))
+    finally:
+        op.implementation = fused
+    return (*(call / len(values) for call in calls), *filters)
+
+
+def bench_membership(n_docs=10**4, n_ids=5000, repeat=3):
+    data = [{"id": i} for i in range(n_docs)]
+    search = DictSearch(match_query={"id": {"$in": list(range(0, 2 * n_ids, 2))}})
+    return min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat))
+
+
+def bench_find(depth=20, width=4, n_docs=2000, repeat=5):
+    data = [
+        {f"w{i}": deep_document(depth, {"v": i}) for i in range(width)} | {"target": {"v": n}} for n in range(n_docs)
+    ]
+    results = []
+    for learn_paths in [False, True]:
+        search = DictSearch(
+            match_query={"$find": ["v", {"$gte": 0}]}, ops_init_config={"find": {"learn_paths": learn_paths}}
+        )
+        results.append(min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)))
+    return (*results, search.get_operator("find").path_hit_rate)
+
+
+def bench_nested_path(depth=12, n_docs=20000, repeat=5):
+    data = [deep_document(depth, {"v": i, "w": -i}) for i in range(n_docs)]
+    query = deep_document(depth, {"v": {"$gte": 0}, "w": {"$lte": 0}})
+    results = []
+    for compile_match in [False, True]:
+        search = DictSearch(match_query=query, compile_match=compile_match)
+        results.append(min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat)))
+    return results
+
+
+def bench_construction(number=2000, repeat=5):
+    """Seconds per DictSearch construction, bare and with a small match and select query"""
+    kwargs = {"match_query": {"id": {"$in": [1, 2]}, "info": {"paid": "yes"}}, "select_query": {"id": 1}}
+    bare = min(timeit.repeat(lambda: DictSearch(), number=number, repeat=repeat)) / number
+    with_queries = min(timeit.repeat(lambda: DictSearch(**kwargs), number=number, repeat=repeat)) / number
+    return bare, with_queries
+
+
+def bench_plan_cache(number=2000, repeat=5):
+    """Seconds per assignment of a known match query, without and with the plan cache, and the cache stats"""
+    query = {
+        "info": {"origin": {"$in": ["Spain", "Sudan"]}, "paid": "yes"},
+        "$or": [{"id": {"$lt": 300}}, {"cargo": {"products": {"$any": {"weight": {"$gt": 1000}}}}}],
+    }
+    search = DictSearch(compile_match=True)
+
+    def assign():
+        search.match_query = query
+
+    uncached = min(timeit.repeat(assign, number=number, repeat=repeat)) / number
+    plan_cache.PLAN_CACHE.maxsize = 128
+    try:
+        cached = min(timeit.repeat(assign, number=number, repeat=repeat)) / number
+        return uncached, cached, plan_cache.PLAN_CACHE.cache_info()
+    finally:
+        plan_cache.PLAN_CACHE.maxsize = 0
+        plan_cache.PLAN_CACHE.clear()
+
+
+def bench_columnar(n_docs=10**6, repeat=3):
+    data = [
+        {"fy": 2010 + i % 10, "assets": {"non_cur": i % 5000}, "liab": {"cur": (i * 7) % 5000}} for i in range(n_docs)
+    ]
+    collection = ColumnarCollection(data, [["fy"], ["assets", "non_cur"], ["liab", "cur"]])
+    search = DictSearch(
+        match_query={"fy": {"$in": [2012, 2013]}, "$or": [{"assets": {"non_cur": {"$lt": 10}}}, {"liab": {"cur": 0}}]}
+    )
+    scan = min(timeit.repeat(lambda: list(search.filter(data)), number=1, repeat=repeat))
+    vectorized = min(timeit.repeat(lambda: list(search.filter(collection)), number=1, repeat=repeat))
+    return scan, vectorized
+
+
+def bench_streaming_memory(n_docs=10**6):
+    search = DictSearch(
+        match_query={"cargo": {"products": {"$any": {"weight": {"$gt": 1000}}}}},
+        select_query={"id": 1, "info": {"origin": 1}, "cargo": {"products": {"$array": {"product": 1}}}},
+    )
+    tracemalloc.start()
+    count = sum(1 for _ in search.filter(generate_fixtures(n_docs)))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, peak
+
+
+def suite_data(n_docs: int, seed=0) -> list:
+    """'n_docs' fixtures cycling over SUITE_POOL distinct ones so the 1M documents runs fit in memory"""
+    random.seed(seed)
+    pool = list(generate_fixtures(min(n_docs, SUITE_POOL)))
+    return [pool[i % len(pool)] for i in range(n_docs)]
+
+
+def measure(func, n_docs: int, repeat=3) -> dict:
+    """Best wall time, throughput and tracemalloc peak of 'func', results are consumed but not kept"""
+    seconds = min(timeit.repeat(lambda: deque(func(), maxlen=0), number=1, repeat=repeat))
+    tracemalloc.start()
+    deque(func(), maxlen=0)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": seconds, "docs_per_second": n_docs / seconds, "peak_bytes": peak}
+
+
+def run_suite(sizes=SUITE_SIZES, repeat=3, cases=None) -> dict:
+    """Measure every SUITE case, plus utils.find_value, at every size in 'sizes'"""
+    results = []
+    for n_docs in sizes:
+        data = suite_data(n_docs)
+        for case, search_kwargs in SUITE.items():
+            if cases and case not in cases:
+                continue
+            search = DictSearch(**search_kwargs)
+            results.append({"case": case, "n_docs": n_docs, **measure(lambda: search.filter(data), n_docs, repeat)})
+        if not cases or "find_value" in cases:
+            find = lambda: (find_value(d_point, ["passengers", "cabin", "crew"]) for d_point in data)
+            results.append({"case": "find_value", "n_docs": n_docs, **measure(find, n_docs, repeat)})
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.time(),
+        "results": results,
+    }
+
+
+def micro_benchmarks():
+    for depth in [4, 12, 24]:
+        for mode in [{}, {"compile_match": True}]:
+            mean, best = bench_dispatch(depth, **mode)
+            print(
+                f"depth={depth:<3} mode={'compiled' if mode else 'interpreted':<12} mean={mean:.4f}s best={best:.4f}s"
+            )
+    for query in [
+        {"id": 1, "info": {"origin": 1, "paid": 1, "arrival": 1}, "cargo": {"products": 1}},
+        {"info": {"origin": 0, "paid": 0}, "cargo": {"products": {"$array": {"uuid": 0, "variations": 0}}}},
+    ]:
+        copies, mean, best = bench_selection(query)
+        print(f"select dict_copies/doc={copies:.2f} mean={mean:.4f}s best={best:.4f}s {query}")
+    mean, best = bench_wide_projection()
+    print(f"select 50 of 500 fields mean={mean:.4f}s best={best:.4f}s")
+    for name, (mean, best) in zip(["match", "select"], bench_slice()):
+        print(f"$slice {name} per doc mean={mean * 1e6:.2f}us best={best * 1e6:.2f}us")
+    print(f"match_query reassigned 1M times, peak RSS KiB per 200k: {soak_query_assignment()}")
+    for query, scan, indexed in bench_index():
+        print(f"index scan={scan:.4f}s indexed={indexed:.4f}s {query}")
+    in_order, planned = bench_planner()
+    print(f"planner insertion order={in_order:.4f}s planned={planned:.4f}s")
+    uncached, cached, hits, misses = bench_operator_cache()
+    print(f"$regex/$func uncached={uncached:.4f}s cached={cached:.4f}s regex hits={hits} misses={misses}")
+    bare, chained, fused, chained_filter, fused_filter = bench_configured_operator()
+    print(f"$gt call bare={bare * 1e9:.0f}ns configured partial chain={chained * 1e9:.0f}ns fused={fused * 1e9:.0f}ns")
+    print(f"configured $gt filter partial chain={chained_filter:.4f}s fused={fused_filter:.4f}s")
+    print(f"$in 5000 ids over 10k docs={bench_membership():.4f}s")
+    bare, with_queries = bench_construction()
+    print(f"DictSearch() {bare * 1e6:.1f}us, with queries {with_queries * 1e6:.1f}us")
+    uncached, cached, info = bench_plan_cache()
+    print(f"match_query assignment uncached={uncached * 1e6:.1f}us plan cache={cached * 1e6:.1f}us {info}")
+    interpreted, compiled = bench_nested_path()
+    print(f"nested path depth 12 interpreted={interpreted:.4f}s compiled={compiled:.4f}s")
+    full, learned, hit_rate = bench_find()
+    print(f"$find depth 20 full search={full:.4f}s learned paths={learned:.4f}s hit rate={hit_rate:.3f}")
+    if columnar.np is not None:
+        scan, vectorized = bench_columnar()
+        print(f"columnar 1M docs scan={scan:.4f}s vectorized={vectorized:.4f}s")
+    for n in [10**4, 10**5, 10**6]:
+        count, peak = bench_streaming_memory(n)
+        print(f"filter generator docs={n:<8} selected={count:<8} peak={peak / 2**20:.2f}MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="dict_search benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SUITE_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--cases", nargs="+", choices=[*SUITE, "find_value"])
+    parser.add_argument("--output", help="write the suite results as JSON to this path instead of stdout")
+    parser.add_argument("--micro", action="store_true", help="run the focused before/after benchmarks instead")
+    args = parser.parse_args()
+    if args.micro:
+        micro_benchmarks()
+    else:
+        report = run_suite(args.sizes, args.repeat, args.cases)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(report, file, indent=4)
+        else:
+            json.dump(report, sys.stdout, indent=4)
@@ -1,10 +1,19 @@
-from unittest import TestCase
+import pickle
+from functools import partial
+from unittest import TestCase, skipIf
 
 from src.dict_search import Operator
 from src.dict_search.operators import exceptions
+from src.dict_search.operators.bases import BATCH_CACHE
+from src.dict_search.operators.operators import low_level_operators as lop
 from test.utils import DemoOpModulo
 from test.new_fixtures import CursedData
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class TestOperatorImplementation(TestCase):
     def test_correct_instantiation(self):
@@ -177,6 +186,70 @@ class TestOperator(TestCase):
             with self.assertRaises(exceptions.OperatorTypeCheckerError):
                 DemoOpModulo(*self.dummy_args, allowed_types=v)
 
+    def test_fused_implementation(self):
+        op = DemoOpModulo(*self.dummy_args)
+        assert op.implementation == op.original_implementation
+        op = DemoOpModulo(*self.dummy_args, expected_exc=TypeError, allowed_types=(int, str), ignored_types=bool)
+        assert not isinstance(op.implementation, partial)
+        self.check_results([10, "10", True, 1.0], [True, False, False, False], op)
+        op.allowed_types = op.ignored_types = op.expected_exc = None
+        assert op.implementation == op.original_implementation
+
+    def test_cache_size(self):
+        op = DemoOpModulo(*self.dummy_args, expected_exc=TypeError, cache_size=2)
+        self.check_results([10, 10, 6, 7, 10, 1.0], [True, True, True, False, True, False], op)
+        assert (op.cache_hits, op.cache_misses) == (1, 5)
+        assert op([2]) is False and op.cache_misses == 5
+        op.cache_size = None
+        assert op(10) is True and (op.cache_hits, op.cache_misses) == (0, 0)
+
+    def test_cache_size_wrapped(self):
+        op = DemoOpModulo(*self.dummy_args, ignored_types=str, expected_exc=ZeroDivisionError, cache_size=8)
+        self.check_results(["10", "10", 10, 10], [False, False, True, True], op)
+        assert (op.cache_hits, op.cache_misses) == (1, 1)
+
+    def test_cache_size_pickle(self):
+        op = pickle.loads(pickle.dumps(DemoOpModulo(*self.dummy_args, cache_size=4)))
+        assert op.cache_size == 4 and op(10) is True and op(10) is True and op.cache_hits == 1
+
+    def test_cache_reconfigured(self):
+        for cache in [4, BATCH_CACHE]:
+            op = DemoOpModulo(*self.dummy_args, cache=cache)
+            assert op(10) is True and op(10) is True
+            op.reminder = 1
+            assert op(10) is False and op(9) is True and op.cache_hits == 0
+        op = lop.In([1, 2], cache_size=4)
+        assert op(1) is True and op(1) is True
+        op.comp = [3]
+        assert op(1) is False and op(3) is True
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_cache_array_attributes(self):
+        op = lop.Equal(np.array([1, 2]), cache=4)
+        assert op(1).tolist() == [True, False]
+        op.comp = np.array([3, 4])
+        assert op(1).tolist() == [False, False] and op(3).tolist() == [True, False]
+        op = DemoOpModulo(np.array([2, 3]), 1, cache=4)
+        assert op(4).tolist() == [False, True]
+        op.denominator = np.array([3, 2])
+        assert op(4).tolist() == [True, False]
+
+    def test_cache_nested_types(self):
+        for cache in [4, BATCH_CACHE]:
+            op = lop.Function(lambda x: type(next(iter(x))) is bool, cache=cache)
+            assert op((1,)) is False and op((True,)) is True
+            assert op(frozenset([1])) is False and op(frozenset([True])) is True
+            assert op.cache_hits == op.cache_misses == 0
+
+    def test_cache_identity_operator(self):
+        op = lop.Is((1, 2), cache_size=4)
+        assert op(op.comp) is True and op(tuple([1, 2])) is False and op.cache_misses == 0
+
+    def test_cache_size_error(self):
+        for v in [0, -1, 1.5, True, "1"]:
+            with self.assertRaises(exceptions.OperatorCacheSizeError):
+                DemoOpModulo(*self.dummy_args, cache_size=v)
+
 
 class TestCustomOp(TestCase):
     pass
@@ -1,4 +1,6 @@
 from collections import abc
+from copy import deepcopy
+from types import GeneratorType
 from unittest import mock
 
 from src.dict_search.dict_search import DictSearch
@@ -120,3 +122,47 @@ class TestSelection(TestCase):
                 original_ports = list(original_data["ports"])
                 if original_ports:
                     assert list(dp["ports"]) != original_ports
+
+    def test_exclude_does_not_modify_input(self):
+        data = [
+            {"a": {"b": {"c": 1, "d": 2}, "e": 3}, "f": [{"g": 1, "h": 2}]},
+            {"a": {"b": {"c": 1}}, "f": []},
+            {"a": {"e": 3}},
+        ]
+        original_data = deepcopy(data)
+        search = DictSearch(select_query={"a": {"b": {"c": 0}, "e": 0}, "f": {"$array": {"g": 0}}})
+        results = self.filter_results(search, data)
+        assert data == original_data
+        assert results == [{"a": {"b": {"d": 2}}, "f": [{"h": 2}]}, {"a": {"b": {}}, "f": []}, {"a": {}}]
+        assert results[0]["a"] is not data[0]["a"] and results[0]["f"][0] is not data[0]["f"][0]
+
+    def test_discarded_dict_id_not_reused(self):
+        search = DictSearch(
+            select_query={"x": {"$array": {"k": 0}}, "g": {"$index": [0, {"a": {"b": 0}}]}},
+            consumable_iterators=GeneratorType,
+        )
+        data = {"x": [{"k": 1}, {"k": 2}], "g": ({"a": {"b": 1, "c": 2}} for _ in range(2))}
+        assert search(data) == {"x": [{"k": 1}, {"k": 2}], "g": [{"a": {"c": 2}}, {"a": {"b": 1, "c": 2}}]}
+        assert data["g"] == [{"a": {"b": 1, "c": 2}}, {"a": {"b": 1, "c": 2}}]
+
+    def test_include_nested_paths(self):
+        data = [{"a": {"b": {"c": 1, "d": 2}, "e": 3}, "f": 4}, {"a": {"e": 3}}]
+        original_data = deepcopy(data)
+        search = DictSearch(select_query={"a": {"b": {"c": 1, "d": 1}, "e": 1}, "f": 1})
+        results = self.filter_results(search, data)
+        assert data == original_data
+        assert results == [data[0], {"a": {"e": 3}}]
+        assert results[0]["a"] is not data[0]["a"]
+
+    def test_select_plan(self):
+        search = DictSearch(select_query={"a": {"b": 1, "c": 1, "d": {"$array": {"e": 1}}}, "f": 1})
+        assert [step[2] for step in search.select_plan] == [("a", "b"), ("a", "c"), ("a", "d"), ("f",)]
+        assert search.select_plan[0][1] is search.select_plan[1][1]
+        search.select_query = {"a": 0}
+        assert [step[2] for step in search.select_plan] == [("a",)]
+
+    def test_select_wide_document(self):
+        data = [{f"k{i}": {"v": i, "w": -i} for i in range(200)}, {"k0": {"w": 0}}, {"k1": None}]
+        search = DictSearch(select_query={f"k{i}": {"v": 1} for i in range(0, 100, 2)})
+        results = self.filter_results(search, data)
+        assert results == [{f"k{i}": {"v": i} for i in range(0, 100, 2)}]